@@ -0,0 +1,34 @@
+"""add a directory version counter
+
+Revision ID: add_directory_version
+Revises: add_row_versions
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = 'add_directory_version'
+down_revision = 'add_row_versions'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if not has_table('directory_version'):
+        op.create_table(
+            'directory_version',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('value', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+def downgrade():
+    if has_table('directory_version'):
+        op.drop_table('directory_version')
@@ -0,0 +1,63 @@
+"""add parsed experience years
+
+Revision ID: add_experience_years
+Revises: add_therapist_listings
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from app.models.therapist import parse_experience_years
+
+# revision identifiers, used by Alembic.
+revision = 'add_experience_years'
+down_revision = 'add_therapist_listings'
+branch_labels = None
+depends_on = None
+
+LISTING_INDEXES = {
+    'ix_therapist_listings_category_experience_years': ['category', 'experience_years'],
+    'ix_therapist_listings_category_rating': ['category', 'rating'],
+    'ix_therapist_listings_experience_years': ['experience_years'],
+    'ix_therapist_listings_rating': ['rating'],
+}
+
+def has_column(table_name, column_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if table_name not in inspector.get_table_names():
+        return None
+    return column_name in [c['name'] for c in inspector.get_columns(table_name)]
+
+def upgrade():
+    bind = op.get_bind()
+    for table_name in ('therapists', 'therapist_listings'):
+        if has_column(table_name, 'experience_years') is False:
+            op.add_column(table_name, sa.Column('experience_years', sa.Integer(), nullable=True))
+
+    if has_column('therapists', 'experience_years'):
+        rows = [
+            {"id": id_, "years": parse_experience_years(experience)}
+            for id_, experience in bind.execute(sa.text("SELECT id, experience FROM therapists"))
+        ]
+        if rows:
+            bind.execute(sa.text("UPDATE therapists SET experience_years = :years WHERE id = :id"), rows)
+            if has_column('therapist_listings', 'experience_years'):
+                bind.execute(sa.text("UPDATE therapist_listings SET experience_years = :years WHERE id = :id"), rows)
+
+    if has_column('therapist_listings', 'experience_years'):
+        existing = {index['name'] for index in inspect(bind).get_indexes('therapist_listings')}
+        for name, columns in LISTING_INDEXES.items():
+            if name not in existing:
+                op.create_index(name, 'therapist_listings', columns, unique=False)
+
+def downgrade():
+    if has_column('therapist_listings', 'experience_years'):
+        for name in LISTING_INDEXES:
+            op.drop_index(name, table_name='therapist_listings')
+        with op.batch_alter_table('therapist_listings') as batch_op:
+            batch_op.drop_column('experience_years')
+    if has_column('therapists', 'experience_years'):
+        with op.batch_alter_table('therapists') as batch_op:
+            batch_op.drop_column('experience_years')
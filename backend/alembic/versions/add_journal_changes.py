@@ -0,0 +1,65 @@
+"""add journal change sequence and tombstones
+
+Revision ID: add_journal_changes
+Revises: add_journal_stats
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from app.db.journal_changes import BACKFILL_CHANGE_SEQ, SYNC_CHANGE_SEQ_COUNTER
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_changes'
+down_revision = 'add_journal_stats'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def has_column(table_name, column_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return column_name in [c['name'] for c in inspector.get_columns(table_name)]
+
+def upgrade():
+    if not has_table('journal_change_seq'):
+        op.create_table(
+            'journal_change_seq',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('value', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not has_table('journal_tombstones'):
+        op.create_table(
+            'journal_tombstones',
+            sa.Column('journal_id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('change_seq', sa.Integer(), nullable=False),
+            sa.Column('deletedAt', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('journal_id')
+        )
+        op.create_index(
+            'ix_journal_tombstones_user_id_change_seq', 'journal_tombstones', ['user_id', 'change_seq'], unique=False
+        )
+    if has_table('journals') and not has_column('journals', 'change_seq'):
+        op.add_column('journals', sa.Column('change_seq', sa.Integer(), nullable=True))
+        op.create_index('ix_journals_user_id_change_seq', 'journals', ['user_id', 'change_seq'], unique=False)
+        op.execute(BACKFILL_CHANGE_SEQ)
+        op.execute(SYNC_CHANGE_SEQ_COUNTER)
+
+def downgrade():
+    if has_table('journals') and has_column('journals', 'change_seq'):
+        op.drop_index('ix_journals_user_id_change_seq', table_name='journals')
+        with op.batch_alter_table('journals') as batch_op:
+            batch_op.drop_column('change_seq')
+    if has_table('journal_tombstones'):
+        op.drop_index('ix_journal_tombstones_user_id_change_seq', table_name='journal_tombstones')
+        op.drop_table('journal_tombstones')
+    if has_table('journal_change_seq'):
+        op.drop_table('journal_change_seq')
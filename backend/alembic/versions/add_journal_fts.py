@@ -0,0 +1,40 @@
+"""add journal full-text index
+
+Revision ID: add_journal_fts
+Revises: add_experience_years
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+from app.db.fts import (
+    JOURNAL_FTS_TABLE,
+    JOURNAL_FTS_ROWS_TABLE,
+    CREATE_JOURNAL_FTS_ROWS,
+    CREATE_JOURNAL_FTS,
+    BACKFILL_JOURNAL_FTS_ROWS,
+    BACKFILL_JOURNAL_FTS,
+)
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_fts'
+down_revision = 'add_experience_years'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if has_table(JOURNAL_FTS_TABLE) or not has_table('journals'):
+        return
+    op.execute(CREATE_JOURNAL_FTS_ROWS)
+    op.execute(CREATE_JOURNAL_FTS)
+    op.execute(BACKFILL_JOURNAL_FTS_ROWS)
+    op.execute(BACKFILL_JOURNAL_FTS)
+
+def downgrade():
+    op.execute(f"DROP TABLE IF EXISTS {JOURNAL_FTS_TABLE}")
+    op.execute(f"DROP TABLE IF EXISTS {JOURNAL_FTS_ROWS_TABLE}")
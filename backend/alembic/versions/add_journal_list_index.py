@@ -0,0 +1,32 @@
+"""add journal list index
+
+Revision ID: add_journal_list_index
+Revises: add_journal_tags
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_list_index'
+down_revision = 'add_journal_tags'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_journals_user_id_updatedAt_id'
+
+def has_index(table_name, index_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if table_name not in inspector.get_table_names():
+        return None
+    return index_name in [index['name'] for index in inspector.get_indexes(table_name)]
+
+def upgrade():
+    if has_index('journals', INDEX_NAME) is False:
+        op.create_index(INDEX_NAME, 'journals', ['user_id', 'updatedAt', 'id'], unique=False)
+
+def downgrade():
+    if has_index('journals', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='journals')
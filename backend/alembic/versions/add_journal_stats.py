@@ -0,0 +1,52 @@
+"""add journal daily stats
+
+Revision ID: add_journal_stats
+Revises: add_journal_list_index
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from app.db.journal_stats import rebuild_journal_stats
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_stats'
+down_revision = 'add_journal_list_index'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if has_table('journal_daily_stats'):
+        return
+    op.create_table(
+        'journal_daily_stats',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('entries', sa.Integer(), nullable=False),
+        sa.Column('words', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_table(
+        'journal_daily_tag_stats',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('tag', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'tag')
+    )
+    if has_table('journals'):
+        rebuild_journal_stats(op.get_bind())
+
+def downgrade():
+    if has_table('journal_daily_tag_stats'):
+        op.drop_table('journal_daily_tag_stats')
+    if has_table('journal_daily_stats'):
+        op.drop_table('journal_daily_stats')
@@ -0,0 +1,36 @@
+"""add journal excerpt and word count
+
+Revision ID: add_journal_summaries
+Revises: add_journal_changes
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from app.db.journal_summaries import fill_journal_summaries
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_summaries'
+down_revision = 'add_journal_changes'
+branch_labels = None
+depends_on = None
+
+def has_column(table_name, column_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if table_name not in inspector.get_table_names():
+        return None
+    return column_name in [c['name'] for c in inspector.get_columns(table_name)]
+
+def upgrade():
+    if has_column('journals', 'excerpt') is False:
+        op.add_column('journals', sa.Column('excerpt', sa.String(), nullable=True))
+        op.add_column('journals', sa.Column('word_count', sa.Integer(), nullable=True))
+        fill_journal_summaries(op.get_bind())
+
+def downgrade():
+    if has_column('journals', 'excerpt'):
+        with op.batch_alter_table('journals') as batch_op:
+            batch_op.drop_column('word_count')
+            batch_op.drop_column('excerpt')
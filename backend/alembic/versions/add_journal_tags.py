@@ -0,0 +1,55 @@
+"""add normalized journal tags
+
+Revision ID: add_journal_tags
+Revises: add_journal_fts
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from app.db.journal_tags import BACKFILL_JOURNAL_TAGS, BACKFILL_JOURNAL_TAG_COUNTS
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_tags'
+down_revision = 'add_journal_fts'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if not has_table('journal_tags'):
+        op.create_table(
+            'journal_tags',
+            sa.Column('journal_id', sa.String(), nullable=False),
+            sa.Column('tag', sa.String(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.ForeignKeyConstraint(['journal_id'], ['journals.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('journal_id', 'tag')
+        )
+        op.create_index('ix_journal_tags_user_id_tag', 'journal_tags', ['user_id', 'tag'], unique=False)
+        if has_table('journals'):
+            op.execute(BACKFILL_JOURNAL_TAGS)
+
+    if not has_table('journal_tag_counts'):
+        op.create_table(
+            'journal_tag_counts',
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('tag', sa.String(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('user_id', 'tag')
+        )
+        op.execute(BACKFILL_JOURNAL_TAG_COUNTS)
+
+def downgrade():
+    if has_table('journal_tag_counts'):
+        op.drop_table('journal_tag_counts')
+    if has_table('journal_tags'):
+        op.drop_index('ix_journal_tags_user_id_tag', table_name='journal_tags')
+        op.drop_table('journal_tags')
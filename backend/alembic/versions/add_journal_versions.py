@@ -0,0 +1,35 @@
+"""add per-user journal version counters
+
+Revision ID: add_journal_versions
+Revises: add_directory_version
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = 'add_journal_versions'
+down_revision = 'add_directory_version'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if not has_table('journal_versions'):
+        op.create_table(
+            'journal_versions',
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('value', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+def downgrade():
+    if has_table('journal_versions'):
+        op.drop_table('journal_versions')
@@ -0,0 +1,39 @@
+"""add row versions for conditional writes
+
+Revision ID: add_row_versions
+Revises: add_journal_summaries
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = 'add_row_versions'
+down_revision = 'add_journal_summaries'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('journals', 'therapists', 'therapist_listings')
+
+def has_column(table_name, column_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if table_name not in inspector.get_table_names():
+        return None
+    return column_name in [c['name'] for c in inspector.get_columns(table_name)]
+
+def upgrade():
+    for table_name in VERSIONED_TABLES:
+        if has_column(table_name, 'version') is False:
+            op.add_column(
+                table_name,
+                sa.Column('version', sa.Integer(), nullable=False, server_default='1')
+            )
+
+def downgrade():
+    for table_name in VERSIONED_TABLES:
+        if has_column(table_name, 'version'):
+            with op.batch_alter_table(table_name) as batch_op:
+                batch_op.drop_column('version')
@@ -0,0 +1,34 @@
+"""add therapist full-text index
+
+Revision ID: add_therapist_fts
+Revises: create_journal_tables
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+from app.db.fts import (
+    THERAPIST_FTS_TABLE,
+    CREATE_THERAPIST_FTS,
+    BACKFILL_THERAPIST_FTS,
+)
+
+# revision identifiers, used by Alembic.
+revision = 'add_therapist_fts'
+down_revision = 'create_journal_tables'
+branch_labels = None
+depends_on = None
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if has_table(THERAPIST_FTS_TABLE) or not has_table('therapists'):
+        return
+    op.execute(CREATE_THERAPIST_FTS)
+    op.execute(BACKFILL_THERAPIST_FTS)
+
+def downgrade():
+    op.execute(f"DROP TABLE IF EXISTS {THERAPIST_FTS_TABLE}")
@@ -0,0 +1,61 @@
+"""add therapist listings read model
+
+Revision ID: add_therapist_listings
+Revises: add_therapist_fts
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = 'add_therapist_listings'
+down_revision = 'add_therapist_fts'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the backfill as of this revision; later revisions add
+# columns to the read model
+BACKFILL_THERAPIST_LISTINGS = """
+INSERT INTO therapist_listings
+    (id, name, category, qualification, experience, description, rating, specializations)
+SELECT
+    t.id, t.name, t.category, t.qualification, t.experience, t.description, t.rating,
+    coalesce((
+        SELECT json_group_array(s.name)
+        FROM therapist_specialization ts
+        JOIN specializations s ON s.id = ts.specialization_id
+        WHERE ts.therapist_id = t.id
+    ), '[]')
+FROM therapists t
+"""
+
+def has_table(table_name):
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+def upgrade():
+    if has_table('therapist_listings'):
+        return
+    op.create_table(
+        'therapist_listings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('qualification', sa.String(), nullable=True),
+        sa.Column('experience', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('rating', sa.Float(), nullable=True),
+        sa.Column('specializations', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapist_listings_category'), 'therapist_listings', ['category'], unique=False)
+    if has_table('therapists'):
+        op.execute(BACKFILL_THERAPIST_LISTINGS)
+
+def downgrade():
+    if has_table('therapist_listings'):
+        op.drop_index(op.f('ix_therapist_listings_category'), table_name='therapist_listings')
+        op.drop_table('therapist_listings')
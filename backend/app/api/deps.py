@@ -1,5 +1,6 @@
-from typing import Generator
-from app.db.session import SessionLocal
+from typing import Any, AsyncGenerator, Callable, Generator
+from fastapi.concurrency import run_in_threadpool
+from app.db.session import AsyncSessionLocal, SessionLocal
 
 def get_db() -> Generator:
     db = SessionLocal()
@@ -7,3 +8,26 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator:
+    # Existing CRUD functions take a Session; call the query-bound ones
+    # through `await db.run_sync(fn, ...)` and CPU-heavy ones through
+    # `run_with_session`
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_with_session(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call `fn(db, *args, **kwargs)` on a worker thread with a session of its own.
+
+    For CRUD work that is heavy on CPU, not just queries: through
+    `run_sync` it would run on the event loop and stall every other
+    request until it finished. Return plain data, since the session is
+    closed by the time the caller sees the result.
+    """
+    def call():
+        db = SessionLocal()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+    return await run_in_threadpool(call)
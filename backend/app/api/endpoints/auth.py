@@ -0,0 +1,93 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_async_db
+from app.core.security import create_access_token
+from app.crud import user as user_crud
+from app.db.writer import group_writer
+from app.schemas.user import LoginRequest, Token, UserCreate
+from app.services.hashing import PoolSaturated, hash_password, password_hasher, verify_password
+
+router = APIRouter()
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+def _token(user_id: str) -> dict:
+    return {"access_token": create_access_token(user_id), "token_type": "bearer"}
+
+async def _authenticate(db: AsyncSession, email: str, password: str) -> Optional[str]:
+    """The user id if the password is right, else None."""
+    user = await db.run_sync(user_crud.get_user_by_email, email)
+    user_id, stored_hash = (user.id, user.hashed_password) if user else (None, None)
+    # Hand the connection back before the slow part
+    await db.rollback()
+    try:
+        # Unknown emails are verified against a dummy hash so they take
+        # as long as a wrong password
+        valid, new_hash = await verify_password(password, stored_hash)
+    except PoolSaturated:
+        raise _busy()
+    if not valid:
+        return None
+    if new_hash:
+        # Stored at another cost: keep the hash computed while verifying
+        await group_writer.run_async(
+            lambda db: user_crud.update_user(db, user_id, hashed_password=new_hash)
+        )
+    return user_id
+
+def _invalid_credentials() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+@router.post("/token", response_model=Token)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # The form's username field carries the email address
+    user_id = await _authenticate(db, form_data.username, form_data.password)
+    if not user_id:
+        raise _invalid_credentials()
+    return _token(user_id)
+
+@router.post("/login", response_model=Token)
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user_id = await _authenticate(db, credentials.email, credentials.password)
+    if not user_id:
+        raise _invalid_credentials()
+    return _token(user_id)
+
+@router.post("/register", response_model=Token)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    email_taken = HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+    # Checked before hashing so a duplicate costs no bcrypt work
+    if await db.run_sync(user_crud.get_user_by_email, user_in.email):
+        raise email_taken
+    await db.rollback()
+    try:
+        hashed_password = await hash_password(user_in.password)
+    except PoolSaturated:
+        raise _busy()
+    try:
+        user_id = await group_writer.run_async(
+            lambda db: user_crud.create_user(db, user_in.email, hashed_password, user_in.full_name).id
+        )
+    except IntegrityError:
+        # Registered concurrently between the check and the insert
+        raise email_taken
+    return _token(user_id)
+
+@router.get("/hashing/stats")
+def get_hashing_stats():
+    return password_hasher.stats()
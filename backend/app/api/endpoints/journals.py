@@ -1,13 +1,24 @@
-from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Depends
-from pydantic import BaseModel
+from datetime import date, datetime, timezone
+from typing import List, Literal, Optional, Union
+import json
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc
-from app.api.deps import get_db
-from app.models.journal import Journal
+from app.api.deps import get_async_db
+from app.db import journal_versions
+from app.db.session import SessionLocal
+from app.db.writer import group_writer
+from app.crud import journal as journal_crud
 from app.core.auth import get_current_user
 from app.models.user import User
+from app.core.config import settings
+from app.core.concurrency import VersionConflict
+from app.core.validation import format_validation_error
+from app.core.etag import check_etag, make_etag
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.services.export import csv_chunks, gzip_chunks, ndjson_chunks
 
 router = APIRouter()
 
@@ -22,97 +33,456 @@ class JournalCreate(JournalBase):
 class JournalUpdate(JournalBase):
     pass
 
+class JournalPatch(BaseModel):
+    """Partial update; omitted fields keep their value."""
+    title: Optional[str] = None
+    content: Optional[str] = None
+    tags: Optional[List[str]] = None
+    # The version the client last saw; a newer one on the server is a 409
+    version: int
+
 class JournalResponse(JournalBase):
     id: str
     createdAt: datetime
     updatedAt: datetime
+    version: int
+    # Highlighted excerpt of the matching content; only set for searches
+    snippet: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class JournalSummary(BaseModel):
+    """List entry for view=summary: an excerpt in place of the content."""
+    id: str
+    title: str
+    tags: List[str]
+    excerpt: str
+    word_count: int
+    createdAt: datetime
+    updatedAt: datetime
+    version: int
+    snippet: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class JournalImport(JournalBase):
+    # Original timestamps from the app being migrated from; both optional
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
+class JournalImportItem(BaseModel):
+    index: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class JournalImportResult(BaseModel):
+    created: int
+    failed: int
+    results: List[JournalImportItem]
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class DeletedJournal(BaseModel):
+    id: str
+    deletedAt: datetime
+
+class JournalChanges(BaseModel):
+    changes: List[JournalResponse]
+    deleted: List[DeletedJournal]
+    # Pass back as `since` to continue; unchanged when nothing new happened
+    next_token: str
+    has_more: bool
+
+class JournalActivity(BaseModel):
+    period: date
+    entries: int
+    words: int
+
+class TagActivity(BaseModel):
+    period: date
+    tag: str
+    count: int
+
+class JournalStats(BaseModel):
+    period: str
+    total_entries: int
+    total_words: int
+    current_streak: int
+    longest_streak: int
+    activity: List[JournalActivity]
+    tags: List[TagCount]
+    tag_activity: List[TagActivity]
+
 class PaginatedJournalResponse(BaseModel):
     page: int
     per_page: int
-    total_pages: int
-    total_records: int
-    data: List[JournalResponse]
+    # Omitted when include_total=false
+    total_pages: Optional[int] = None
+    total_records: Optional[int] = None
+    data: List[Union[JournalResponse, JournalSummary]]
+    next_cursor: Optional[str] = None
+
+class JournalCursorPage(BaseModel):
+    per_page: int
+    data: List[Union[JournalResponse, JournalSummary]]
+    next_cursor: Optional[str] = None
+
+def _next_cursor(journals) -> str:
+    last = journals[-1]
+    return encode_cursor({"updatedAt": last.updatedAt.isoformat(), "id": last.id})
+
+def _decode_journal_cursor(cursor: str) -> tuple:
+    """Return the (updatedAt, id) a cursor points after."""
+    try:
+        data = decode_cursor(cursor)
+        return datetime.fromisoformat(data["updatedAt"]), str(data["id"])
+    except (InvalidCursor, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@router.get("/", response_model=PaginatedJournalResponse)
+async def _journal_version(db: AsyncSession, user_id: str) -> int:
+    """The user's journal version as committed, by any process; ETags are built from it."""
+    return await db.scalar(journal_versions.version_query(user_id)) or 0
+
+def _journal_items(journals, snippets, view: str = "full") -> list:
+    schema = JournalSummary if view == "summary" else JournalResponse
+    data = [schema.model_validate(journal) for journal in journals]
+    for item in data:
+        item.snippet = snippets.get(item.id)
+    return data
+
+@router.get("/", response_model=Union[PaginatedJournalResponse, JournalCursorPage])
 async def get_journals(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    view: Literal["full", "summary"] = Query("full", description="summary returns an excerpt instead of the content"),
     search: Optional[str] = None,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    tags: Optional[List[str]] = Query(None, description="Exact tags; repeat the parameter for several"),
+    tag_match: Literal["any", "all"] = "any"
 ):
-    query = db.query(Journal).filter(Journal.user_id == current_user.id)
-
-    # Apply search filter if provided
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Journal.title.ilike(search_term),
-                Journal._tags.ilike(f"%{search}%"),
-                Journal.content.ilike(search_term)
-            )
-        )
-
-    # Apply date filters if provided
-    if start_date:
-        query = query.filter(Journal.updatedAt >= start_date)
-    if end_date:
-        query = query.filter(Journal.updatedAt <= end_date)
+    etag = make_etag(
+        "journals", current_user.id, await _journal_version(db, current_user.id),
+        None if cursor is not None else page, per_page, cursor, include_total, view,
+        search, start_date, end_date, tuple(sorted(set(tags or ()))), tag_match
+    )
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
 
-    # Get total count for pagination
-    total_records = query.count()
-    total_pages = (total_records + per_page - 1) // per_page
+    filters = dict(
+        search=search,
+        start_date=start_date,
+        end_date=end_date,
+        tags=tags,
+        tag_match=tag_match
+    )
 
-    # Apply pagination and ordering
-    query = query.order_by(desc(Journal.updatedAt))\
-                .offset((page - 1) * per_page)\
-                .limit(per_page)
+    if cursor is not None:
+        # Cursor mode: seek from the last (updatedAt, id) seen, no offset
+        # and no count
+        after_updated, after_id = _decode_journal_cursor(cursor)
+        journals, snippets = await db.run_sync(
+            journal_crud.get_journals_after,
+            current_user.id,
+            after_updated=after_updated,
+            after_id=after_id,
+            limit=per_page + 1,
+            summary=view == "summary",
+            **filters
+        )
+        has_more = len(journals) > per_page
+        journals = journals[:per_page]
+        return {
+            "per_page": per_page,
+            "data": _journal_items(journals, snippets, view),
+            "next_cursor": _next_cursor(journals) if has_more else None
+        }
 
-    journals = query.all()
+    skip = (page - 1) * per_page
+    # Without a total, one extra row tells us whether a next page exists
+    journals, total_records, snippets = await db.run_sync(
+        journal_crud.get_journals,
+        current_user.id,
+        skip=skip,
+        limit=per_page if include_total else per_page + 1,
+        include_total=include_total,
+        summary=view == "summary",
+        **filters
+    )
+    if include_total:
+        has_more = skip + len(journals) < total_records
+        total_pages = (total_records + per_page - 1) // per_page
+    else:
+        has_more = len(journals) > per_page
+        journals = journals[:per_page]
+        total_pages = None
 
     return {
         "page": page,
         "per_page": per_page,
         "total_pages": total_pages,
         "total_records": total_records,
-        "data": journals
+        "data": _journal_items(journals, snippets, view),
+        # Lets page-number clients switch to cursor mode from any page
+        "next_cursor": _next_cursor(journals) if has_more else None
     }
 
+@router.get("/tags", response_model=List[TagCount])
+async def get_journal_tags(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    etag = make_etag("journal-tags", current_user.id, await _journal_version(db, current_user.id))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return await db.run_sync(journal_crud.get_tag_counts, current_user.id)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+async def _json_rows(rows: list):
+    for index, row in enumerate(rows):
+        yield index, row, None
+
+async def _ndjson_rows(request: Request):
+    """Yield (index, row, error) per line of an NDJSON body as it arrives."""
+    buffer = b""
+    index = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield (index, *_parse_line(line))
+                index += 1
+    if buffer.strip():
+        yield (index, *_parse_line(buffer))
+
+def _parse_line(line: bytes) -> tuple:
+    try:
+        return json.loads(line), None
+    except ValueError as exc:
+        return None, f"Invalid JSON: {exc}"
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _import_values(entry: JournalImport) -> dict:
+    created_at = _naive_utc(entry.createdAt) or datetime.utcnow()
+    return {
+        "title": entry.title,
+        "content": entry.content,
+        "tags": entry.tags,
+        "createdAt": created_at,
+        "updatedAt": _naive_utc(entry.updatedAt) or created_at,
+    }
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _export_chunks(user_id: str, format: str, compress: bool):
+    # The request's session is closed before a streamed body is sent, so
+    # the export reads through a session of its own
+    db = SessionLocal()
+    try:
+        rows = journal_crud.iter_journal_export(db, user_id)
+        if format == "csv":
+            # Tags keep their JSON form so the column round-trips
+            rows = ({**row, "tags": json.dumps(row["tags"])} for row in rows)
+            chunks = csv_chunks(rows, journal_crud.EXPORT_FIELDS)
+        else:
+            chunks = ndjson_chunks(rows)
+        yield from gzip_chunks(chunks) if compress else chunks
+    finally:
+        db.close()
+
+def _decode_sync_token(token: str) -> int:
+    try:
+        seq = decode_cursor(token).get("seq")
+    except (InvalidCursor, AttributeError):
+        seq = None
+    if not isinstance(seq, int) or seq < 0:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return seq
+
+def _version_conflict(exc: VersionConflict) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Journal was modified; current version is {exc.current_version}"
+    )
+
+async def _update_journal(user_id: str, journal_id: str, **changes) -> JournalResponse:
+    def write(db: Session):
+        db_journal = journal_crud.update_journal(db, user_id, journal_id, **changes)
+        return JournalResponse.model_validate(db_journal) if db_journal else None
+
+    try:
+        journal = await group_writer.run_async(write)
+    except VersionConflict as exc:
+        raise _version_conflict(exc)
+    if not journal:
+        raise HTTPException(status_code=404, detail="Journal not found")
+    return journal
+
+@router.get("/changes", response_model=JournalChanges)
+async def get_journal_changes(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    since: Optional[str] = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    since_seq = _decode_sync_token(since) if since else 0
+    etag = make_etag("journal-changes", current_user.id, await _journal_version(db, current_user.id), since_seq, limit)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    result = await db.run_sync(journal_crud.get_changes, current_user.id, since=since_seq, limit=limit)
+    return {
+        "changes": result["changes"],
+        "deleted": result["deleted"],
+        "next_token": encode_cursor({"seq": result["next_seq"]}),
+        "has_more": result["has_more"]
+    }
+
+@router.get("/stats", response_model=JournalStats)
+async def get_journal_stats(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    period: Literal["day", "week"] = "day",
+    tag_limit: int = Query(10, ge=1, le=100)
+):
+    # Streaks depend on today's date as well as the data
+    etag = make_etag(
+        "journal-stats", current_user.id, await _journal_version(db, current_user.id),
+        datetime.utcnow().date(), start_date, end_date, period, tag_limit
+    )
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return await db.run_sync(
+        journal_crud.get_stats,
+        current_user.id,
+        start_date=start_date,
+        end_date=end_date,
+        period=period,
+        tag_limit=tag_limit
+    )
+
+@router.get("/export")
+def export_journals(
+    current_user: User = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = Query(False, description="Compress the export as a .gz file")
+):
+    filename = f"journals.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        _export_chunks(current_user.id, format, gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/bulk", response_model=JournalImportResult)
+async def bulk_import_journals(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Import a JSON array of entries, or an NDJSON stream of one entry per line.
+
+    Valid entries are committed in chunks as they arrive; invalid ones are
+    reported by index and skipped.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPES):
+        rows = _ndjson_rows(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of journal entries")
+        rows = _json_rows(body)
+
+    results = []
+    chunk = []
+
+    async def flush():
+        ids = await db.run_sync(
+            journal_crud.bulk_create_journals, current_user.id, [entry for _, entry in chunk]
+        )
+        results.extend({"index": index, "id": id_} for (index, _), id_ in zip(chunk, ids))
+        chunk.clear()
+
+    async for index, row, error in rows:
+        if error is None:
+            try:
+                chunk.append((index, _import_values(JournalImport.model_validate(row))))
+            except ValidationError as exc:
+                error = format_validation_error(exc)
+        if error is not None:
+            results.append({"index": index, "error": error})
+        if len(chunk) >= settings.JOURNAL_IMPORT_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+
+    results.sort(key=lambda item: item["index"])
+    created = sum(1 for item in results if item.get("id"))
+    return {"created": created, "failed": len(results) - created, "results": results}
+
 @router.post("/", response_model=JournalResponse)
 async def create_journal(
     journal: JournalCreate,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_journal = Journal(
-        user_id=current_user.id,
-        title=journal.title,
-        content=journal.content,
-        tags=journal.tags
-    )
-    db.add(db_journal)
-    db.commit()
-    db.refresh(db_journal)
-    return db_journal
+    # Serialized inside the group-commit writer, before its session closes
+    return await group_writer.run_async(lambda db: JournalResponse.model_validate(
+        journal_crud.create_journal(
+            db,
+            current_user.id,
+            title=journal.title,
+            content=journal.content,
+            tags=journal.tags
+        )
+    ))
 
 @router.get("/{journal_id}", response_model=JournalResponse)
 async def get_journal(
     journal_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    journal = db.query(Journal).filter(
-        Journal.id == journal_id,
-        Journal.user_id == current_user.id
-    ).first()
-    
+    # Entries are versioned through their owner's collection version
+    etag = make_etag("journal", journal_id, await _journal_version(db, current_user.id))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    journal = await db.run_sync(journal_crud.get_journal, current_user.id, journal_id)
     if not journal:
         raise HTTPException(status_code=404, detail="Journal not found")
     
@@ -122,40 +492,37 @@ async def get_journal(
 async def update_journal(
     journal_id: str,
     journal_update: JournalUpdate,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_journal = db.query(Journal).filter(
-        Journal.id == journal_id,
-        Journal.user_id == current_user.id
-    ).first()
-    
-    if not db_journal:
-        raise HTTPException(status_code=404, detail="Journal not found")
-    
-    db_journal.title = journal_update.title
-    db_journal.content = journal_update.content
-    db_journal.tags = journal_update.tags
-    db_journal.updatedAt = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(db_journal)
-    return db_journal
+    return await _update_journal(
+        current_user.id,
+        journal_id,
+        title=journal_update.title,
+        content=journal_update.content,
+        tags=journal_update.tags
+    )
+
+@router.patch("/{journal_id}", response_model=JournalResponse)
+async def patch_journal(
+    journal_id: str,
+    journal_patch: JournalPatch,
+    current_user: User = Depends(get_current_user)
+):
+    # Unset and null fields alike are left unchanged
+    return await _update_journal(current_user.id, journal_id, **journal_patch.model_dump())
 
 @router.delete("/{journal_id}")
 async def delete_journal(
     journal_id: str,
-    db: Session = Depends(get_db),
+    version: Optional[int] = Query(None, description="Only delete if the entry is still at this version"),
     current_user: User = Depends(get_current_user)
 ):
-    db_journal = db.query(Journal).filter(
-        Journal.id == journal_id,
-        Journal.user_id == current_user.id
-    ).first()
-    
-    if not db_journal:
+    try:
+        deleted = await group_writer.run_async(
+            lambda db: journal_crud.delete_journal(db, current_user.id, journal_id, version)
+        )
+    except VersionConflict as exc:
+        raise _version_conflict(exc)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Journal not found")
-    
-    db.delete(db_journal)
-    db.commit()
     return {"message": "Journal deleted successfully"}
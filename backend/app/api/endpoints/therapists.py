@@ -1,92 +1,355 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from typing import Any, List, Literal, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.crud import therapist as therapist_crud
-from app.schemas.therapist import Therapist, TherapistCreate, TherapistUpdate, TherapistPagination
-from app.api.deps import get_db
+from app.crud import journal as journal_crud
+from app.schemas.therapist import Therapist, TherapistCreate, TherapistUpdate, TherapistPagination, TherapistCursorPage, TherapistImportResult, TherapistRecommendation
+from app.api.deps import get_async_db, run_with_session
+from app.core.auth import get_current_user
+from app.models.user import User
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.core.cache import directory_cache
+from app.core.concurrency import VersionConflict
+from app.core.etag import check_etag, make_etag
+from app.db import fts, listings
+from app.db.writer import group_writer
+from app.services.facets import FACETS
+from app.services.fuzzy import words as fuzzy_words
 import math
 
 router = APIRouter()
 
-@router.get("", response_model=TherapistPagination)
-def get_therapists(
-    db: Session = Depends(get_db),
-    page: int = Query(1, gt=0),
-    per_page: int = Query(10, gt=0),
-    search: Optional[str] = None,
-    category: Optional[str] = None,
-    min_rating: Optional[float] = Query(None, ge=0, le=5)
+# One index rebuild at a time; readers that find the indexes stale while
+# one runs wait for it instead of starting their own
+_rebuild_lock = asyncio.Lock()
+
+def _is_indexed(version: int) -> bool:
+    indexed = therapist_crud.indexed_version()
+    return indexed is not None and indexed >= version
+
+async def _directory_version(db: AsyncSession) -> int:
+    """Version of the directory as committed, by any process.
+
+    The in-memory indexes are brought up to it first. A write of this
+    process that has committed but not yet run its hooks is waited for;
+    only a change made elsewhere costs a reload, done on a worker thread.
+    """
+    version = await db.scalar(listings.DIRECTORY_VERSION) or 0
+    if _is_indexed(version):
+        return version
+    await group_writer.settled()
+    if _is_indexed(version):
+        return version
+    async with _rebuild_lock:
+        if not _is_indexed(version):
+            await run_with_session(therapist_crud.build_indexes)
+    return version
+
+def _therapist_to_dict(t) -> dict:
+    return {
+        "id": t.id,
+        "name": t.name,
+        "category": t.category,
+        "qualification": t.qualification,
+        "experience": t.experience,
+        "experience_years": t.experience_years,
+        "description": t.description,
+        "rating": t.rating,
+        "version": t.version,
+        "specialization": [s.name for s in t.specializations] if t.specializations else []
+    }
+
+def _next_cursor(therapists, sort: Optional[str]) -> str:
+    last = therapists[-1]
+    if sort is None:
+        return encode_cursor({"id": last["id"]})
+    return encode_cursor({"sort": sort, "key": therapist_crud.sort_key(last, sort), "id": last["id"]})
+
+def _decode_therapist_cursor(cursor: str, sort: Optional[str]) -> tuple:
+    """Return the (sort key, id) a cursor points after."""
+    try:
+        data = decode_cursor(cursor)
+    except InvalidCursor:
+        data = {}
+    # A cursor is only meaningful for the ordering it was issued under
+    if not isinstance(data.get("id"), int) or data.get("sort") != sort:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return data.get("key"), data["id"]
+
+def _fuzzy_therapists(
+    db: Session,
+    page: int,
+    per_page: int,
+    include_total: bool,
+    facets: List[str],
+    filters: dict
 ):
+    # Ranked by similarity from the in-memory trigram index; the ranking is
+    # already materialized, so paging is a slice
+    ranked = therapist_crud.get_fuzzy_matches(db, **filters)
     skip = (page - 1) * per_page
-    therapists = therapist_crud.get_therapists(
-        db,
-        skip=skip,
-        limit=per_page,
-        search=search,
-        category=category,
-        min_rating=min_rating
-    )
-    total = therapist_crud.get_total_therapists(
-        db,
-        search=search,
-        category=category,
-        min_rating=min_rating
-    )
+    total = len(ranked)
+    return {
+        "total": total if include_total else None,
+        "total_pages": math.ceil(total / per_page) if include_total else None,
+        "page": page,
+        "per_page": per_page,
+        "items": therapist_crud.get_listings(db, ranked[skip:skip + per_page]),
+        "next_cursor": None,
+        "facets": therapist_crud.get_facet_counts(db, facets, therapist_ids=ranked) if facets else None
+    }
+
+def _list_therapists(
+    db: Session,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    include_total: bool,
+    facets: List[str],
+    sort: Optional[str],
+    rating_weight: float,
+    filters: dict
+):
+    facet_counts = therapist_crud.get_facet_counts(db, facets, **filters) if facets else None
 
-    # Calculate total pages
-    total_pages = math.ceil(total / per_page)
-
-    # Convert therapists to list of dictionaries with specialization names
-    therapist_list = []
-    for t in therapists:
-        therapist_dict = {
-            "id": t.id,
-            "name": t.name,
-            "category": t.category,
-            "qualification": t.qualification,
-            "experience": t.experience,
-            "description": t.description,
-            "rating": t.rating,
-            "specialization": [s.name for s in t.specializations] if t.specializations else []
-        }
-        therapist_list.append(therapist_dict)
+    if cursor is not None:
+        # Cursor mode: seek from the last (sort key, id) seen, no offset and
+        # no count
+        after_key, after_id = _decode_therapist_cursor(cursor, sort)
+        therapists = therapist_crud.get_therapists_after(
+            db,
+            after_id=after_id,
+            after_key=after_key,
+            limit=per_page + 1,
+            sort=sort,
+            **filters
+        )
+        has_more = len(therapists) > per_page
+        therapists = therapists[:per_page]
+        return TherapistCursorPage(
+            per_page=per_page,
+            items=therapists,
+            next_cursor=_next_cursor(therapists, sort) if has_more else None,
+            facets=facet_counts
+        )
+
+    skip = (page - 1) * per_page
+    # Without a total, one extra row tells us whether a next page exists
+    limit = per_page if include_total else per_page + 1
+    if sort == "relevance":
+        therapists, total = therapist_crud.get_therapists_by_relevance(
+            db,
+            skip=skip,
+            limit=limit,
+            rating_weight=rating_weight,
+            include_total=include_total,
+            **filters
+        )
+    else:
+        therapists, total = therapist_crud.get_therapists_page(
+            db,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            include_total=include_total,
+            **filters
+        )
+
+    if include_total:
+        has_more = skip + len(therapists) < total
+        # Calculate total pages
+        total_pages = math.ceil(total / per_page)
+    else:
+        has_more = len(therapists) > per_page
+        therapists = therapists[:per_page]
+        total_pages = None
 
     return {
         "total": total,
         "total_pages": total_pages,
         "page": page,
         "per_page": per_page,
-        "items": therapist_list
+        "items": therapists,
+        # Lets page-number clients switch to cursor mode from any page;
+        # relevance ranks are not keyset-addressable
+        "next_cursor": _next_cursor(therapists, sort) if has_more and sort != "relevance" else None,
+        "facets": facet_counts
     }
 
+@router.get("", response_model=Union[TherapistPagination, TherapistCursorPage])
+async def get_therapists(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    page: int = Query(1, gt=0),
+    per_page: int = Query(10, gt=0, le=100),
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    min_experience: Optional[int] = Query(None, ge=0),
+    max_experience: Optional[int] = Query(None, ge=0),
+    include_total: bool = True,
+    facets: Optional[str] = Query(None, description="Comma-separated: category, specialization, rating"),
+    fuzzy: bool = Query(False, description="Typo-tolerant search ranked by similarity"),
+    sort: Optional[Literal["relevance", "experience", "rating"]] = Query(
+        None,
+        description="relevance ranks search matches by BM25; experience and rating sort descending"
+    ),
+    rating_weight: float = Query(0.0, ge=0, le=10, description="Blend rating into relevance ranking")
+):
+    requested_facets = sorted({f.strip() for f in facets.split(",") if f.strip()}) if facets else []
+    unknown = set(requested_facets) - set(FACETS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facets: {', '.join(sorted(unknown))}")
+    fuzzy = fuzzy and bool(search)
+    if fuzzy and cursor is not None:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not available for fuzzy search")
+    if sort == "relevance" and not search:
+        # Nothing to score without a query; keep the default order
+        sort = None
+    if sort == "relevance" and cursor is not None:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not available for relevance sorting")
+
+    filters = dict(
+        search=search,
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
+    # Normalize the key so equivalent queries share one cache entry
+    match = fts.match_query(search) if search else None
+    key = (
+        "fuzzy" if fuzzy else "list",
+        None if cursor is not None else page,
+        per_page,
+        cursor,
+        " ".join(fuzzy_words(search)) if fuzzy else match.lower() if match else None,
+        category,
+        min_rating,
+        min_experience,
+        max_experience,
+        include_total or cursor is not None,
+        tuple(requested_facets),
+        sort,
+        rating_weight if sort == "relevance" else None
+    )
+    # Writers in any process bump the stored version, so one lookup tells
+    # whether cached pages and the client's copy are still current
+    version = await _directory_version(db)
+    not_modified = check_etag(request, response, make_etag(version, key))
+    if not_modified:
+        return not_modified
+    if fuzzy:
+        return await directory_cache.get_or_set(version, key, lambda: run_with_session(
+            _fuzzy_therapists,
+            page=page,
+            per_page=per_page,
+            include_total=include_total,
+            facets=requested_facets,
+            filters=filters
+        ))
+    # Facet counts and ranking are CPU work, so a miss is built on a worker
+    # thread rather than on the event loop
+    return await directory_cache.get_or_set(version, key, lambda: run_with_session(
+        _list_therapists,
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        include_total=include_total,
+        facets=requested_facets,
+        sort=sort,
+        rating_weight=rating_weight,
+        filters=filters
+    ))
+
+@router.get("/recommended", response_model=List[TherapistRecommendation])
+async def get_recommended_therapists(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(10, gt=0, le=50)
+):
+    # Only for its side effect of catching the recommender up
+    await _directory_version(db)
+    # Every tag use counts, so themes the user keeps writing about weigh more
+    tag_counts = {
+        row["tag"]: row["count"]
+        for row in await db.run_sync(journal_crud.get_tag_counts, current_user.id)
+    }
+    return await run_with_session(therapist_crud.get_recommended_therapists, tag_counts, limit)
+
 @router.get("/categories", response_model=List[str])
-def get_categories(db: Session = Depends(get_db)):
-    return therapist_crud.get_categories(db)
+async def get_categories(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    version = await _directory_version(db)
+    not_modified = check_etag(request, response, make_etag(version, "categories"))
+    if not_modified:
+        return not_modified
+    return await directory_cache.get_or_set(
+        version,
+        ("categories",), lambda: run_with_session(therapist_crud.get_categories)
+    )
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    return directory_cache.stats()
 
 @router.get("/{therapist_id}", response_model=Therapist)
-def get_therapist(therapist_id: int, db: Session = Depends(get_db)):
-    therapist = therapist_crud.get_therapist(db, therapist_id)
+async def get_therapist(
+    therapist_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    version = await _directory_version(db)
+    not_modified = check_etag(request, response, make_etag("therapist", therapist_id, version))
+    if not_modified:
+        return not_modified
+    therapist = await directory_cache.get_or_set(
+        version,
+        ("therapist", therapist_id),
+        lambda: run_with_session(therapist_crud.get_therapist_listing, therapist_id)
+    )
     if not therapist:
         raise HTTPException(status_code=404, detail="Therapist not found")
     return therapist
 
 @router.post("", response_model=Therapist)
-def create_therapist(therapist: TherapistCreate, db: Session = Depends(get_db)):
-    return therapist_crud.create_therapist(db, therapist)
+async def create_therapist(therapist: TherapistCreate):
+    # Single-row writes go through the group-commit writer; the result is
+    # serialized there, before the writer's session is closed
+    return await group_writer.run_async(
+        lambda db: _therapist_to_dict(therapist_crud.create_therapist(db, therapist))
+    )
+
+@router.post("/bulk", response_model=TherapistImportResult)
+async def bulk_import_therapists(therapists: List[Any] = Body(...)):
+    # Rows are validated one by one so a bad row is reported, not fatal;
+    # that is CPU work, done on a worker thread
+    return await run_with_session(therapist_crud.bulk_create_therapists, therapists)
 
 @router.put("/{therapist_id}", response_model=Therapist)
-def update_therapist(
+async def update_therapist(
     therapist_id: int,
-    therapist_update: TherapistUpdate,
-    db: Session = Depends(get_db)
+    therapist_update: TherapistUpdate
 ):
-    therapist = therapist_crud.update_therapist(db, therapist_id, therapist_update)
+    try:
+        therapist = await group_writer.run_async(
+            lambda db: therapist_crud.update_therapist(db, therapist_id, therapist_update)
+        )
+    except VersionConflict as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Therapist was modified; current version is {exc.current_version}"
+        )
     if not therapist:
         raise HTTPException(status_code=404, detail="Therapist not found")
     return therapist
 
 @router.delete("/{therapist_id}")
-def delete_therapist(therapist_id: int, db: Session = Depends(get_db)):
-    if not therapist_crud.delete_therapist(db, therapist_id):
+async def delete_therapist(therapist_id: int):
+    if not await group_writer.run_async(lambda db: therapist_crud.delete_therapist(db, therapist_id)):
         raise HTTPException(status_code=404, detail="Therapist not found")
     return {"message": "Therapist deleted successfully"}
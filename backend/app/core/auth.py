@@ -1,30 +1,38 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.api.deps import get_db
+from app.core.cache import user_cache
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.crud import user as user_crud
+from app.db.session import AsyncSessionLocal
 from app.models.user import User
 
-# This is a simplified auth implementation for development purposes
-# In a real application, you would implement proper JWT token validation
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/token")
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+async def _load_user(user_id: str) -> User:
+    async with AsyncSessionLocal() as db:
+        user = await db.run_sync(user_crud.get_user, user_id)
+        if user:
+            # Cached copies outlive the session, and handlers only read them
+            db.expunge(user)
+        return user
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    # For development, we'll just return a test user
-    # In a real application, you would validate the token and get the user from the database
-    
-    # Check if we have a test user, if not create one
-    user = db.query(User).filter(User.email == "test@example.com").first()
-    
-    if not user:
-        # This is just for development - in production you would validate tokens properly
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    # Stateless: the token itself says who the caller is, and the user row
+    # normally comes from the cache rather than the database
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    user_id = decode_access_token(token)
+    if user_id is None:
+        raise credentials_exception
+
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await _load_user(user_id)
+        if user is None:
+            raise credentials_exception
+        user_cache.set(user_id, user)
     return user
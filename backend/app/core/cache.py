@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+from app.core.config import settings
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+_MISSING = object()
+
+class VersionedCache(TTLCache):
+    """TTLCache whose keys are scoped to a version of the data behind them.
+
+    Callers read the version from the database before building a value;
+    once a write moves it on, entries stored under older versions can no
+    longer be hit and age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self.version = 0
+
+    async def get_or_set(self, version: int, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        # `version` must be read before the factory runs, so a write that
+        # lands meanwhile can never be cached under its new version
+        with self._lock:
+            self.version = max(self.version, version)
+        versioned_key = (version, key)
+        value = self.get(versioned_key, _MISSING)
+        if value is _MISSING:
+            value = await factory()
+            self.set(versioned_key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {**super().stats(), "version": self.version}
+
+# Therapist directory reads: listings, categories and profiles
+directory_cache = VersionedCache(
+    maxsize=settings.THERAPIST_CACHE_SIZE,
+    ttl=settings.THERAPIST_CACHE_TTL
+)
+
+# Users looked up by id from access token claims
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL
+)
@@ -0,0 +1,6 @@
+class VersionConflict(Exception):
+    """A conditional write found the row at a different version."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Version conflict: current version is {current_version}")
+        self.current_version = current_version
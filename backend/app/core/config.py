@@ -1,3 +1,5 @@
+import secrets
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -7,6 +9,41 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api"
     
     SQLITE_URL: str = "sqlite:///./therapist.db"
+    # Seconds a connection waits for another's write lock before failing
+    SQLITE_BUSY_TIMEOUT: float = 5.0
+
+    # In-process cache for therapist directory reads
+    THERAPIST_CACHE_SIZE: int = 1024
+    THERAPIST_CACHE_TTL: float = 300.0
+
+    # Group commit: single-entry journal and therapist writes that arrive
+    # within WRITE_BATCH_WINDOW seconds of each other share one transaction
+    WRITE_BATCH_ENABLED: bool = True
+    WRITE_BATCH_WINDOW: float = 0.002
+    WRITE_BATCH_MAX: int = 64
+
+    # JWT access tokens issued by POST /api/token. Without SECRET_KEY in
+    # the environment every process signs with a random key of its own, so
+    # tokens stop working on restart and are not shared between workers
+    SECRET_KEY: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
+    JWT_ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+
+    # bcrypt cost for new hashes; a stored hash at any other cost is
+    # replaced on the user's next successful login
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing runs on its own threads; requests beyond the busy
+    # workers plus this many queued ones are refused with a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 16
+
+    # Users resolved from token claims, so authenticated requests skip the
+    # users query; entries are dropped when the user changes
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: float = 300.0
+
+    # Entries committed per transaction by POST /api/journals/bulk
+    JOURNAL_IMPORT_CHUNK_SIZE: int = 500
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,22 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    """Pack the last row's sort key and id into an opaque, URL-safe token."""
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(data, dict):
+        raise InvalidCursor("Malformed cursor")
+    return data
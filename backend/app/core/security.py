@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from jose import JWTError, jwt
+from passlib.context import CryptContext
+from app.core.config import settings
+
+# Hashes at a cost other than BCRYPT_ROUNDS count as needing an update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Check a password; on success also return a new hash if the stored one is outdated.
+
+    With no stored hash a dummy verification runs instead, so unknown
+    accounts cost as much as wrong passwords.
+    """
+    if hashed_password is None:
+        pwd_context.dummy_verify()
+        return False, None
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None) -> str:
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    return jwt.encode(
+        {"sub": user_id, "exp": expire},
+        settings.SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM
+    )
+
+def decode_access_token(token: str) -> Optional[str]:
+    """Return the user id a valid, unexpired token was issued for, else None."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    return user_id if isinstance(user_id, str) else None
@@ -0,0 +1,9 @@
+from pydantic import ValidationError
+
+def format_validation_error(exc: ValidationError) -> str:
+    """One-line summary of a pydantic error, for per-row import results."""
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(messages)
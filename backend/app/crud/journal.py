@@ -0,0 +1,442 @@
+from datetime import date, datetime, timedelta
+import json
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import delete, desc, func, select, tuple_, update
+from sqlalchemy.orm import Session, defer
+from app.models.journal import (
+    Journal,
+    JournalTag,
+    JournalTagCount,
+    JournalDailyStats,
+    JournalDailyTagStats,
+    JournalTombstone,
+    generate_uuid,
+    count_words,
+    make_excerpt
+)
+from app.db import fts, journal_changes, journal_stats, journal_tags, journal_versions
+from app.db.writer import commit
+from app.core.concurrency import VersionConflict
+
+def _stats(journal: Journal) -> journal_stats.EntryStats:
+    return journal_stats.entry_stats(journal.createdAt, journal.content, journal.tags)
+
+def _snapshot(journal: Journal) -> dict:
+    return {
+        "id": journal.id,
+        "user_id": journal.user_id,
+        "title": journal.title,
+        "tags": journal.tags,
+        "content": journal.content,
+    }
+
+def get_journal(db: Session, user_id: str, journal_id: str) -> Optional[Journal]:
+    return db.query(Journal).filter(
+        Journal.id == journal_id,
+        Journal.user_id == user_id
+    ).first()
+
+def _filtered_query(
+    db: Session,
+    user_id: str,
+    search: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    tags: Optional[List[str]] = None,
+    tag_match: str = "any"
+):
+    """A user's entries narrowed by the list filters, plus the FTS query if any.
+
+    Returns (None, None) when the search has nothing searchable in it.
+    """
+    query = db.query(Journal).filter(Journal.user_id == user_id)
+
+    match = fts.journal_match_query(user_id, search) if search else None
+    if search:
+        if match is None:
+            return None, None
+        matching_ids = db.query(fts.journal_rows.c.journal_id).filter(
+            fts.journal_rows.c.rowid.in_(fts.journal_match_rows(match))
+        )
+        query = query.filter(Journal.id.in_(matching_ids))
+
+    if tags:
+        tags = list(dict.fromkeys(tags))
+        tagged = select(JournalTag.journal_id).where(
+            JournalTag.user_id == user_id,
+            JournalTag.tag.in_(tags)
+        )
+        if tag_match == "all":
+            tagged = tagged.group_by(JournalTag.journal_id).having(func.count() == len(tags))
+        query = query.filter(Journal.id.in_(tagged))
+
+    if start_date:
+        query = query.filter(Journal.updatedAt >= start_date)
+    if end_date:
+        query = query.filter(Journal.updatedAt <= end_date)
+    return query, match
+
+def _page(db: Session, query, match: Optional[str], limit: int, skip: int = 0, summary: bool = False):
+    if summary:
+        # List previews use the stored excerpt; never read the content column
+        query = query.options(defer(Journal.content, raiseload=True))
+    # Newest first, with id as the tie-breaker so pages are stable; the
+    # (user_id, updatedAt, id) index serves both the filter and the order
+    journals = query.order_by(desc(Journal.updatedAt), desc(Journal.id)).offset(skip).limit(limit).all()
+    snippets = fts.journal_snippets(db, match, [j.id for j in journals]) if match else {}
+    return journals, snippets
+
+def get_journals(
+    db: Session,
+    user_id: str,
+    skip: int = 0,
+    limit: int = 10,
+    include_total: bool = True,
+    summary: bool = False,
+    **filters
+) -> Tuple[List[Journal], Optional[int], Dict[str, str]]:
+    """Return a page of a user's entries, newest first, with the total.
+
+    Searches go through the FTS5 index and also return a highlighted
+    content snippet for each entry on the page. `tags` matches exactly,
+    requiring any or all of them depending on `tag_match`. The total is
+    None unless `include_total` is set. With `summary` the content column
+    is deferred and must not be touched.
+    """
+    query, match = _filtered_query(db, user_id, **filters)
+    if query is None:
+        return [], 0 if include_total else None, {}
+    total = query.with_entities(func.count()).scalar() if include_total else None
+    journals, snippets = _page(db, query, match, limit, skip, summary)
+    return journals, total, snippets
+
+def get_journals_after(
+    db: Session,
+    user_id: str,
+    after_updated: datetime,
+    after_id: str,
+    limit: int = 10,
+    summary: bool = False,
+    **filters
+) -> Tuple[List[Journal], Dict[str, str]]:
+    """Entries after the (updatedAt, id) position of the last one seen."""
+    query, match = _filtered_query(db, user_id, **filters)
+    if query is None:
+        return [], {}
+    query = query.filter(tuple_(Journal.updatedAt, Journal.id) < tuple_(after_updated, after_id))
+    return _page(db, query, match, limit, summary=summary)
+
+EXPORT_FIELDS = ("id", "title", "content", "tags", "createdAt", "updatedAt")
+
+def iter_journal_export(db: Session, user_id: str, batch_size: int = 500) -> Iterator[dict]:
+    """Yield every entry of a user, oldest first, as plain export rows.
+
+    Rows are fetched `batch_size` at a time from a server-side cursor and
+    never turned into ORM objects, so memory does not grow with the number
+    of entries.
+    """
+    stmt = select(
+        Journal.id,
+        Journal.title,
+        Journal.content,
+        Journal._tags,
+        Journal.createdAt,
+        Journal.updatedAt
+    ).where(
+        Journal.user_id == user_id
+    ).order_by(
+        Journal.createdAt, Journal.id
+    ).execution_options(yield_per=batch_size)
+    for id_, title, content, tags, created_at, updated_at in db.execute(stmt):
+        yield {
+            "id": id_,
+            "title": title,
+            "content": content,
+            "tags": json.loads(tags),
+            "createdAt": created_at.isoformat(),
+            "updatedAt": updated_at.isoformat(),
+        }
+
+def get_tag_counts(db: Session, user_id: str) -> List[dict]:
+    """A user's tags with the number of entries using each, most used first."""
+    rows = db.query(JournalTagCount.tag, JournalTagCount.count).filter(
+        JournalTagCount.user_id == user_id
+    ).order_by(desc(JournalTagCount.count), JournalTagCount.tag)
+    return [{"tag": tag, "count": count} for tag, count in rows]
+
+def get_changes(db: Session, user_id: str, since: int = 0, limit: int = 100) -> dict:
+    """Entries written and ids deleted after change sequence `since`.
+
+    Both kinds are merged in sequence order and cut at `limit`, so
+    `next_seq` is a position every returned change is at or before.
+    """
+    journals = db.query(Journal).filter(
+        Journal.user_id == user_id,
+        Journal.change_seq > since
+    ).order_by(Journal.change_seq).limit(limit + 1).all()
+    # A first sync has nothing to forget
+    tombstones = db.query(JournalTombstone).filter(
+        JournalTombstone.user_id == user_id,
+        JournalTombstone.change_seq > since
+    ).order_by(JournalTombstone.change_seq).limit(limit + 1).all() if since else []
+
+    changes = sorted(journals + tombstones, key=lambda change: change.change_seq)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return {
+        "changes": [change for change in changes if isinstance(change, Journal)],
+        "deleted": [
+            {"id": change.journal_id, "deletedAt": change.deletedAt}
+            for change in changes
+            if isinstance(change, JournalTombstone)
+        ],
+        "next_seq": changes[-1].change_seq if changes else since,
+        "has_more": has_more,
+    }
+
+def _period_start(day: date, period: str) -> date:
+    # Weeks start on Monday
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+def _streaks(days: List[date], today: date) -> Tuple[int, int]:
+    """(current, longest) runs of consecutive days with at least one entry.
+
+    The current streak is still alive if the last entry was yesterday.
+    """
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous is not None and today - previous <= timedelta(days=1) else 0
+    return current, longest
+
+def get_stats(
+    db: Session,
+    user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    period: str = "day",
+    tag_limit: int = 10
+) -> dict:
+    """Activity, streaks and tag trends read from the daily aggregate tables."""
+    def in_range(column):
+        conditions = []
+        if start_date:
+            conditions.append(column >= start_date)
+        if end_date:
+            conditions.append(column <= end_date)
+        return conditions
+
+    daily = db.query(JournalDailyStats.day, JournalDailyStats.entries, JournalDailyStats.words).filter(
+        JournalDailyStats.user_id == user_id,
+        *in_range(JournalDailyStats.day)
+    ).order_by(JournalDailyStats.day)
+    activity = defaultdict(lambda: {"entries": 0, "words": 0})
+    for day, entries, words in daily:
+        bucket = activity[_period_start(day, period)]
+        bucket["entries"] += entries
+        bucket["words"] += words
+
+    # Streaks span the whole history, not just the requested range
+    active_days = [day for day, in db.query(JournalDailyStats.day).filter(
+        JournalDailyStats.user_id == user_id
+    ).order_by(JournalDailyStats.day)]
+    current_streak, longest_streak = _streaks(active_days, datetime.utcnow().date())
+
+    tag_total = func.sum(JournalDailyTagStats.count)
+    top_tags = db.query(JournalDailyTagStats.tag, tag_total).filter(
+        JournalDailyTagStats.user_id == user_id,
+        *in_range(JournalDailyTagStats.day)
+    ).group_by(JournalDailyTagStats.tag).order_by(desc(tag_total), JournalDailyTagStats.tag).limit(tag_limit).all()
+
+    tag_activity = defaultdict(int)
+    if top_tags:
+        tag_days = db.query(JournalDailyTagStats.day, JournalDailyTagStats.tag, JournalDailyTagStats.count).filter(
+            JournalDailyTagStats.user_id == user_id,
+            JournalDailyTagStats.tag.in_([tag for tag, _ in top_tags]),
+            *in_range(JournalDailyTagStats.day)
+        )
+        for day, tag, count in tag_days:
+            tag_activity[_period_start(day, period), tag] += count
+
+    return {
+        "period": period,
+        "total_entries": sum(bucket["entries"] for bucket in activity.values()),
+        "total_words": sum(bucket["words"] for bucket in activity.values()),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "activity": [{"period": start, **bucket} for start, bucket in sorted(activity.items())],
+        "tags": [{"tag": tag, "count": count} for tag, count in top_tags],
+        "tag_activity": [
+            {"period": start, "tag": tag, "count": count}
+            for (start, tag), count in sorted(tag_activity.items())
+        ],
+    }
+
+def create_journal(db: Session, user_id: str, title: str, content: str, tags: List[str]) -> Journal:
+    db_journal = Journal(
+        user_id=user_id,
+        title=title,
+        content=content,
+        tags=tags,
+        excerpt=make_excerpt(content),
+        word_count=count_words(content),
+        change_seq=journal_changes.allocate(db)
+    )
+    db.add(db_journal)
+    db.flush()
+    fts.index_journal(db, _snapshot(db_journal))
+    journal_tags.save_tags(db, user_id, db_journal.id, [], tags)
+    journal_stats.add_stats(db, user_id, [_stats(db_journal)])
+    journal_versions.bump(db, user_id)
+    commit(db)
+    db.refresh(db_journal)
+    return db_journal
+
+def bulk_create_journals(db: Session, user_id: str, entries: List[dict]) -> List[str]:
+    """Insert one chunk of validated entries in a single transaction.
+
+    Each entry carries title, content, tags, createdAt and updatedAt; the
+    timestamps are stored as given. Returns the new ids in entry order.
+    """
+    rows = [
+        {
+            "id": generate_uuid(),
+            "user_id": user_id,
+            "title": entry["title"],
+            "content": entry["content"],
+            "tags": json.dumps(entry["tags"]),
+            "excerpt": make_excerpt(entry["content"]),
+            "word_count": count_words(entry["content"]),
+            "createdAt": entry["createdAt"],
+            "updatedAt": entry["updatedAt"],
+        }
+        for entry in entries
+    ]
+    if not rows:
+        return []
+    last_seq = journal_changes.allocate(db, len(rows))
+    for seq, row in enumerate(rows, start=last_seq - len(rows) + 1):
+        row["change_seq"] = seq
+    db.execute(Journal.__table__.insert(), rows)
+    ids = [row["id"] for row in rows]
+    fts.index_new_journals(db, ids)
+    journal_tags.add_tags(db, user_id, [(row["id"], entry["tags"]) for row, entry in zip(rows, entries)])
+    journal_stats.add_stats(db, user_id, [
+        journal_stats.entry_stats(entry["createdAt"], entry["content"], entry["tags"])
+        for entry in entries
+    ])
+    journal_versions.bump(db, user_id)
+    commit(db)
+    return ids
+
+def _stored_stats(row) -> journal_stats.EntryStats:
+    # Same as _stats, from the stored word count rather than the content
+    return journal_stats.EntryStats(row.createdAt.date(), row.word_count, frozenset(json.loads(row.tags)))
+
+def _stored_stats_columns():
+    return Journal.createdAt, Journal.word_count, Journal._tags.label("tags")
+
+def _raise_if_exists(db: Session, user_id: str, journal_id: str) -> None:
+    """After a conditional write matched nothing: conflict if the entry exists."""
+    current = db.execute(
+        select(Journal.version).where(Journal.id == journal_id, Journal.user_id == user_id)
+    ).scalar()
+    if current is not None:
+        raise VersionConflict(current)
+
+def update_journal(
+    db: Session,
+    user_id: str,
+    journal_id: str,
+    title: Optional[str] = None,
+    content: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    version: Optional[int] = None
+) -> Optional[Journal]:
+    """Change the given fields with a single UPDATE ... RETURNING.
+
+    Fields left as None keep their value. With `version` the update only
+    applies to that version of the entry and raises VersionConflict if it
+    has moved on. Returns None if the entry does not exist.
+    """
+    match = [Journal.id == journal_id, Journal.user_id == user_id]
+    if version is not None:
+        match.append(Journal.version == version)
+
+    old_stats = None
+    if content is not None or tags is not None:
+        # The tag and stats read models need the values being replaced,
+        # which RETURNING cannot report; title-only edits skip this read
+        old = db.execute(select(*_stored_stats_columns()).where(*match)).first()
+        if old is None:
+            _raise_if_exists(db, user_id, journal_id)
+            return None
+        old_stats = _stored_stats(old)
+
+    values = {
+        Journal.updatedAt: datetime.utcnow(),
+        Journal.version: Journal.version + 1,
+        Journal.change_seq: journal_changes.allocate(db),
+    }
+    if title is not None:
+        values[Journal.title] = title
+    if content is not None:
+        values[Journal.content] = content
+        values[Journal.excerpt] = make_excerpt(content)
+        values[Journal.word_count] = count_words(content)
+    if tags is not None:
+        values[Journal._tags] = json.dumps(tags)
+    db_journal = db.execute(
+        update(Journal)
+        .where(*match)
+        .values(values)
+        .returning(Journal)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).scalar()
+    if db_journal is None:
+        _raise_if_exists(db, user_id, journal_id)
+        return None
+
+    if old_stats is not None:
+        journal_tags.save_tags(db, user_id, journal_id, old_stats.tags, db_journal.tags)
+        journal_stats.save_stats(db, user_id, old_stats, _stats(db_journal))
+    fts.index_journal(db, _snapshot(db_journal))
+    journal_versions.bump(db, user_id)
+    commit(db)
+    return db_journal
+
+def delete_journal(db: Session, user_id: str, journal_id: str, version: Optional[int] = None) -> bool:
+    """Delete an entry with a single DELETE ... RETURNING.
+
+    With `version` only that version is deleted; VersionConflict is raised
+    if the entry has changed since.
+    """
+    match = [Journal.id == journal_id, Journal.user_id == user_id]
+    if version is not None:
+        match.append(Journal.version == version)
+    old = db.execute(
+        delete(Journal)
+        .where(*match)
+        .returning(*_stored_stats_columns())
+        .execution_options(synchronize_session=False)
+    ).first()
+    if old is None:
+        _raise_if_exists(db, user_id, journal_id)
+        return False
+
+    old_stats = _stored_stats(old)
+    journal_tags.save_tags(db, user_id, journal_id, old_stats.tags, [])
+    journal_stats.save_stats(db, user_id, old_stats, None)
+    db.add(JournalTombstone(
+        journal_id=journal_id,
+        user_id=user_id,
+        change_seq=journal_changes.allocate(db)
+    ))
+    fts.unindex_journal(db, journal_id)
+    journal_versions.bump(db, user_id)
+    commit(db)
+    return True
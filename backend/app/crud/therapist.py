@@ -1,12 +1,175 @@
-from typing import List, Optional
+import json
+import threading
+from typing import Any, List, Optional
+from pydantic import ValidationError
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from app.models.therapist import Therapist, Specialization
+from sqlalchemy import delete, func, insert, or_, select, tuple_, update
+from app.models.therapist import Therapist, TherapistListing, Specialization, therapist_specialization, parse_experience_years
 from app.schemas.therapist import TherapistCreate, TherapistUpdate
+from app.db import fts, listings
+from app.db.writer import commit
+from app.core.concurrency import VersionConflict
+from app.core.validation import format_validation_error
+from app.services.facets import FacetIndex, facet_index, ids_to_mask
+from app.services.fuzzy import TrigramIndex, fuzzy_index
+from app.services.recommender import TherapistRecommender, therapist_recommender
+
+# Reads are served from the flat therapist_listings read model
+LISTING_COLUMNS = (
+    TherapistListing.id,
+    TherapistListing.name,
+    TherapistListing.category,
+    TherapistListing.qualification,
+    TherapistListing.experience,
+    TherapistListing.experience_years,
+    TherapistListing.description,
+    TherapistListing.rating,
+    TherapistListing.version,
+    TherapistListing.specializations,
+)
+
+def _listing_item(row) -> dict:
+    item = {column.key: row._mapping[column.key] for column in LISTING_COLUMNS}
+    item["specialization"] = json.loads(item.pop("specializations"))
+    return item
+
+# Therapist columns a snapshot copies
+_ROW_FIELDS = (
+    "id", "name", "category", "qualification", "experience",
+    "experience_years", "description", "rating", "version",
+)
+
+def _snapshot(therapist) -> dict:
+    # Plain copy of the row the read models and indexes are built from,
+    # taken before commit expires the instance
+    snapshot = {key: getattr(therapist, key) for key in _ROW_FIELDS}
+    snapshot["specializations"] = [s.name for s in therapist.specializations]
+    return snapshot
+
+def _save_read_models(db: Session, therapist: dict) -> None:
+    """Rewrite the FTS document and listing row inside the write transaction."""
+    fts.index_therapist(db, therapist)
+    listings.save_listings(db, [therapist])
+
+# Directory version the in-memory indexes reflect, None until first built
+_indexed_version: Optional[int] = None
+_index_lock = threading.Lock()
+
+def _after_write(version: int, saved: List[dict] = (), removed: List[int] = ()) -> None:
+    """Apply a committed write to the in-memory indexes.
+
+    Only done when they were current just before it; otherwise another
+    process wrote in between and the next read reloads them instead.
+    """
+    global _indexed_version
+    with _index_lock:
+        if _indexed_version != version - 1:
+            return
+        for t in saved:
+            facet_index.upsert(t["id"], t["category"], t["rating"], t["specializations"])
+            fuzzy_index.upsert(t["id"], [t["name"], t["category"], *t["specializations"]])
+            therapist_recommender.upsert(t["id"], t["specializations"], t["rating"])
+        for therapist_id in removed:
+            facet_index.remove(therapist_id)
+            fuzzy_index.remove(therapist_id)
+            therapist_recommender.remove(therapist_id)
+        _indexed_version = version
+
+def build_indexes(db: Session) -> int:
+    """Rebuild the in-memory directory indexes and return the version they reflect.
+
+    New indexes are built off to the side while the current ones keep
+    serving reads, and swapped in only if nothing newer was applied
+    meanwhile. No lock is held while the rows are read.
+    """
+    global _indexed_version
+    # Read the version before the rows: at worst the rows are newer than
+    # the recorded version, which only costs one more reload
+    version = listings.get_directory_version(db)
+    rows = db.execute(select(
+        TherapistListing.id,
+        TherapistListing.name,
+        TherapistListing.category,
+        TherapistListing.rating,
+        TherapistListing.specializations
+    )).all()
+    facets, fuzzy, recommender = FacetIndex(), TrigramIndex(), TherapistRecommender()
+    for therapist_id, name, category, rating, specializations in rows:
+        specializations = json.loads(specializations)
+        facets.upsert(therapist_id, category, rating, specializations)
+        fuzzy.upsert(therapist_id, [name, category, *specializations])
+        recommender.upsert(therapist_id, specializations, rating)
+    with _index_lock:
+        if _indexed_version is None or version > _indexed_version:
+            facet_index.replace_with(facets)
+            fuzzy_index.replace_with(fuzzy)
+            therapist_recommender.replace_with(recommender)
+            _indexed_version = version
+        return _indexed_version
+
+def indexed_version() -> Optional[int]:
+    """Directory version the in-memory indexes reflect, None before the first build."""
+    return _indexed_version
+
+# Sortable listing columns. Both sort descending with id as the tie-breaker
+# in the same direction, so (category, column) indexes serve the order and
+# the keyset predicate
+SORT_COLUMNS = {
+    "experience": TherapistListing.experience_years,
+    "rating": TherapistListing.rating,
+}
+
+def _apply_filters(
+    query,
+    search: str | None = None,
+    category: str | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+):
+    if search:
+        # Prefix match against the FTS5 index instead of scanning with ilike
+        match = fts.match_query(search)
+        if match:
+            query = query.filter(fts.therapist_match_clause(TherapistListing.id, match))
+
+    if category:
+        query = query.filter(TherapistListing.category == category)
+
+    if min_rating is not None:
+        query = query.filter(TherapistListing.rating >= min_rating)
+
+    if min_experience is not None:
+        query = query.filter(TherapistListing.experience_years >= min_experience)
+
+    if max_experience is not None:
+        query = query.filter(TherapistListing.experience_years <= max_experience)
+
+    return query
+
+def _has_filters(**filters) -> bool:
+    return any(value is not None and value != "" for value in filters.values())
+
+def _order_by(sort: str | None) -> tuple:
+    if sort in SORT_COLUMNS:
+        return SORT_COLUMNS[sort].desc(), TherapistListing.id.desc()
+    return (TherapistListing.id,)
+
+def sort_key(item: dict, sort: str | None):
+    """Value of the sort column for a listing item, as stored in cursors."""
+    if sort == "experience":
+        return item["experience_years"]
+    if sort == "rating":
+        return item["rating"]
+    return None
 
 def get_therapist(db: Session, therapist_id: int) -> Optional[Therapist]:
     return db.query(Therapist).options(joinedload(Therapist.specializations)).filter(Therapist.id == therapist_id).first()
 
+def get_therapist_listing(db: Session, therapist_id: int) -> Optional[dict]:
+    row = db.query(*LISTING_COLUMNS).filter(TherapistListing.id == therapist_id).first()
+    return _listing_item(row) if row else None
+
 def get_therapists(
     db: Session,
     skip: int = 0,
@@ -14,49 +177,236 @@ def get_therapists(
     search: str | None = None,
     category: str | None = None,
     min_rating: float | None = None,
-) -> list[Therapist]:
-    query = db.query(Therapist).options(joinedload(Therapist.specializations))
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+    sort: str | None = None,
+) -> list[dict]:
+    query = db.query(*LISTING_COLUMNS)
+    query = _apply_filters(
+        query,
+        search=search,
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
 
-    if search:
-        query = query.join(Therapist.specializations).filter(
-            Therapist.name.ilike(f"%{search}%") | 
-            Therapist.description.ilike(f"%{search}%") |
-            Specialization.name.ilike(f"%{search}%")
-        ).distinct()  # Add distinct to avoid duplicates due to join
+    return [_listing_item(row) for row in query.order_by(*_order_by(sort)).offset(skip).limit(limit)]
 
-    if category:
-        query = query.filter(Therapist.category == category)
+def get_therapists_page(
+    db: Session,
+    skip: int = 0,
+    limit: int = 10,
+    search: str | None = None,
+    category: str | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+    sort: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict], int | None]:
+    filters = dict(
+        search=search,
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
+    # One round trip for rows and total: COUNT(*) OVER() is evaluated over
+    # the filtered set before LIMIT/OFFSET apply
+    if not include_total:
+        return get_therapists(db, skip=skip, limit=limit, sort=sort, **filters), None
 
-    if min_rating is not None:
-        query = query.filter(Therapist.rating >= min_rating)
+    query = db.query(*LISTING_COLUMNS, func.count().over().label("total"))
+    query = _apply_filters(query, **filters)
+    rows = query.order_by(*_order_by(sort)).offset(skip).limit(limit).all()
 
-    return query.offset(skip).limit(limit).all()
+    if rows:
+        return [_listing_item(row) for row in rows], rows[0].total
+    # Past the last page no row carries the window count, so fall back
+    total = get_total_therapists(db, **filters) if skip else 0
+    return [], total
 
-def get_total_therapists(
+def get_therapists_by_relevance(
     db: Session,
+    search: str,
+    skip: int = 0,
+    limit: int = 10,
+    category: str | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+    rating_weight: float = 0.0,
+    include_total: bool = True,
+) -> tuple[list[dict], int | None]:
+    """Rank matches by BM25 over name, description and specializations.
+
+    ORDER BY ... LIMIT lets SQLite keep only the best skip + limit rows
+    while scanning matches instead of sorting all of them.
+    """
+    match = fts.match_query(search)
+    if not match:
+        return [], 0 if include_total else None
+    filters = dict(
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
+
+    score = fts.therapist_bm25()
+    if rating_weight:
+        # bm25() is negative, so scaling it up by rating ranks better-rated
+        # therapists higher
+        score = score * (1 + rating_weight * func.coalesce(TherapistListing.rating, 0) / 5)
+
+    # bm25() is only callable while the FTS scan drives the query, so score
+    # in a subquery and apply the window count outside it
+    scored = db.query(*LISTING_COLUMNS, score.label("score"))\
+        .select_from(fts.therapists_fts)\
+        .join(TherapistListing, TherapistListing.id == fts.therapists_fts.c.rowid)\
+        .filter(fts.therapist_match(match))
+    scored = _apply_filters(scored, **filters).subquery()
+
+    columns = [scored.c[column.key] for column in LISTING_COLUMNS]
+    if include_total:
+        columns.append(func.count().over().label("total"))
+    rows = db.query(*columns)\
+        .order_by(scored.c.score, scored.c.id)\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
+
+    if not include_total:
+        return [_listing_item(row) for row in rows], None
+    if rows:
+        return [_listing_item(row) for row in rows], rows[0].total
+    total = get_total_therapists(db, search=search, **filters) if skip else 0
+    return [], total
+
+def get_fuzzy_matches(
+    db: Session,
+    search: str,
+    category: str | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+) -> list[int]:
+    """Therapist ids matching `search` despite typos, best match first."""
+    filters = dict(
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
+    ranked = [therapist_id for therapist_id, _ in fuzzy_index.search(search)]
+    if ranked and _has_filters(**filters):
+        query = _apply_filters(db.query(TherapistListing.id), **filters)
+        allowed = {id_ for id_, in query}
+        ranked = [therapist_id for therapist_id in ranked if therapist_id in allowed]
+    return ranked
+
+def get_listings(db: Session, therapist_ids: list[int]) -> list[dict]:
+    """Listing rows for the given ids, in the order given."""
+    rows = db.query(*LISTING_COLUMNS).filter(TherapistListing.id.in_(therapist_ids))
+    by_id = {row.id: _listing_item(row) for row in rows}
+    return [by_id[therapist_id] for therapist_id in therapist_ids if therapist_id in by_id]
+
+def get_recommended_therapists(db: Session, tag_counts: dict, limit: int) -> list[dict]:
+    """Listings for the therapists best matching a user's journal tags, with scores."""
+    scores = dict(therapist_recommender.recommend(tag_counts, limit))
+    items = get_listings(db, list(scores))
+    for item in items:
+        item["score"] = round(scores[item["id"]], 4)
+    return items
+
+def get_therapists_after(
+    db: Session,
+    after_id: int | None = None,
+    after_key: Any = None,
+    limit: int = 10,
     search: str | None = None,
     category: str | None = None,
     min_rating: float | None = None,
-) -> int:
-    query = db.query(func.count(Therapist.id.distinct()))  # Use distinct count
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+    sort: str | None = None,
+) -> list[dict]:
+    # Keyset pagination: seek past the last (sort key, id) seen instead of
+    # skipping rows
+    query = db.query(*LISTING_COLUMNS)
+    query = _apply_filters(
+        query,
+        search=search,
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
 
-    if search:
-        query = query.join(Therapist.specializations).filter(
-            Therapist.name.ilike(f"%{search}%") | 
-            Therapist.description.ilike(f"%{search}%") |
-            Specialization.name.ilike(f"%{search}%")
-        )
+    if after_id is not None:
+        column = SORT_COLUMNS.get(sort)
+        if column is None:
+            query = query.filter(TherapistListing.id > after_id)
+        elif after_key is None:
+            # NULLs sort last in descending order; only NULL rows remain
+            query = query.filter(column.is_(None), TherapistListing.id < after_id)
+        else:
+            query = query.filter(or_(
+                tuple_(column, TherapistListing.id) < tuple_(after_key, after_id),
+                column.is_(None)
+            ))
 
-    if category:
-        query = query.filter(Therapist.category == category)
+    return [_listing_item(row) for row in query.order_by(*_order_by(sort)).limit(limit)]
 
-    if min_rating is not None:
-        query = query.filter(Therapist.rating >= min_rating)
+def get_total_therapists(
+    db: Session,
+    search: str | None = None,
+    category: str | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+) -> int:
+    query = db.query(func.count(TherapistListing.id))
+    query = _apply_filters(
+        query,
+        search=search,
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
 
     return query.scalar()
 
+def get_facet_counts(
+    db: Session,
+    facets: List[str],
+    search: str | None = None,
+    category: str | None = None,
+    min_rating: float | None = None,
+    min_experience: int | None = None,
+    max_experience: int | None = None,
+    therapist_ids: list[int] | None = None,
+) -> dict:
+    if therapist_ids is not None:
+        # Result set already resolved elsewhere, e.g. by fuzzy search
+        return facet_index.counts(facets, ids_to_mask(therapist_ids))
+    filters = dict(
+        search=search,
+        category=category,
+        min_rating=min_rating,
+        min_experience=min_experience,
+        max_experience=max_experience
+    )
+    if not _has_filters(**filters):
+        return facet_index.counts(facets)
+    # Resolve the filtered id set once, then count every facet against it
+    query = _apply_filters(db.query(TherapistListing.id), **filters)
+    return facet_index.counts(facets, ids_to_mask(id_ for id_, in query))
+
 def get_categories(db: Session) -> List[str]:
-    return [category[0] for category in db.query(Therapist.category).distinct().all()]
+    return [category[0] for category in db.query(TherapistListing.category).distinct().all()]
 
 def create_therapist(db: Session, therapist: TherapistCreate) -> Therapist:
     # Create specializations first
@@ -73,48 +423,152 @@ def create_therapist(db: Session, therapist: TherapistCreate) -> Therapist:
         category=therapist.category,
         qualification=therapist.qualification,
         experience=therapist.experience,
+        experience_years=parse_experience_years(therapist.experience),
         description=therapist.description,
         rating=therapist.rating,
         specializations=specializations
     )
     
     db.add(db_therapist)
-    db.commit()
+    db.flush()
+    saved = _snapshot(db_therapist)
+    _save_read_models(db, saved)
+    version = listings.bump_directory_version(db)
+    commit(db, after=lambda: _after_write(version, saved=[saved]))
     db.refresh(db_therapist)
     return db_therapist
 
+def _specialization_ids(db: Session, names: set) -> dict:
+    """Map names to specialization ids, creating the missing ones in one batch."""
+    spec_ids = dict(db.execute(
+        select(Specialization.name, Specialization.id).where(Specialization.name.in_(names))
+    ).all()) if names else {}
+    missing = [{"name": name} for name in names if name not in spec_ids]
+    if missing:
+        spec_ids.update(db.execute(
+            insert(Specialization).returning(Specialization.name, Specialization.id),
+            missing
+        ).all())
+    return spec_ids
+
+def bulk_create_therapists(db: Session, rows: List[Any]) -> dict:
+    """Import many therapists in a single transaction.
+
+    Rows that fail validation are reported by index and skipped; the rest
+    are inserted with a handful of executemany statements regardless of
+    how many specializations they reference.
+    """
+    errors = []
+    valid: List[tuple[int, TherapistCreate]] = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, TherapistCreate.model_validate(row)))
+        except ValidationError as exc:
+            errors.append({"index": index, "error": format_validation_error(exc)})
+
+    if not valid:
+        return {"created": 0, "ids": [], "errors": errors}
+
+    spec_ids = _specialization_ids(db, {name for _, t in valid for name in t.specialization})
+
+    db.execute(insert(Therapist), [
+        {**t.model_dump(exclude={"specialization"}), "experience_years": parse_experience_years(t.experience)}
+        for _, t in valid
+    ])
+    # SQLite hands out rowids as max(id) + 1 and this transaction holds the
+    # write lock, so the batch received a contiguous run ending at max(id)
+    last_id = db.execute(select(func.max(Therapist.id))).scalar()
+    therapist_ids = list(range(last_id - len(valid) + 1, last_id + 1))
+
+    links = [
+        {"therapist_id": therapist_id, "specialization_id": spec_ids[name]}
+        for therapist_id, (_, t) in zip(therapist_ids, valid)
+        for name in dict.fromkeys(t.specialization)
+    ]
+    if links:
+        db.execute(insert(therapist_specialization), links)
+
+    saved = [
+        {
+            **t.model_dump(),
+            "id": therapist_id,
+            "experience_years": parse_experience_years(t.experience),
+            "version": 1,
+            "specializations": list(dict.fromkeys(t.specialization)),
+        }
+        for therapist_id, (_, t) in zip(therapist_ids, valid)
+    ]
+    fts.index_new_therapists(db, saved)
+    listings.save_listings(db, saved)
+    version = listings.bump_directory_version(db)
+    commit(db, after=lambda: _after_write(version, saved=saved))
+    return {"created": len(therapist_ids), "ids": therapist_ids, "errors": errors}
+
 def update_therapist(
     db: Session, 
     therapist_id: int, 
     therapist_update: TherapistUpdate
-) -> Optional[Therapist]:
-    db_therapist = get_therapist(db, therapist_id)
-    if not db_therapist:
-        return None
-        
+) -> Optional[dict]:
+    """Apply the fields set on the update with a single UPDATE ... RETURNING.
+
+    If the update carries a version, it only applies to that version of the
+    therapist and raises VersionConflict if it has moved on. Returns the
+    therapist as served by the directory, or None if it does not exist.
+    """
     update_data = therapist_update.model_dump(exclude_unset=True)
-    
-    if "specialization" in update_data:
-        specializations = []
-        for spec_name in update_data["specialization"]:
-            spec = db.query(Specialization).filter(Specialization.name == spec_name).first()
-            if not spec:
-                spec = Specialization(name=spec_name)
-            specializations.append(spec)
-        db_therapist.specializations = specializations
-        del update_data["specialization"]
-    
-    for field, value in update_data.items():
-        setattr(db_therapist, field, value)
-    
-    db.commit()
-    db.refresh(db_therapist)
-    return db_therapist
+    version = update_data.pop("version", None)
+    names = update_data.pop("specialization", None)
+    if "experience" in update_data:
+        update_data["experience_years"] = parse_experience_years(update_data["experience"])
+
+    match = [Therapist.id == therapist_id]
+    if version is not None:
+        match.append(Therapist.version == version)
+    row = db.execute(
+        update(Therapist)
+        .where(*match)
+        .values(**update_data, version=Therapist.version + 1)
+        .returning(*(getattr(Therapist, key) for key in _ROW_FIELDS))
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        current = db.execute(select(Therapist.version).where(Therapist.id == therapist_id)).scalar()
+        if current is not None:
+            raise VersionConflict(current)
+        return None
+
+    if names is not None:
+        names = list(dict.fromkeys(names))
+        spec_ids = _specialization_ids(db, set(names))
+        db.execute(delete(therapist_specialization).where(
+            therapist_specialization.c.therapist_id == therapist_id
+        ))
+        if names:
+            db.execute(insert(therapist_specialization), [
+                {"therapist_id": therapist_id, "specialization_id": spec_ids[name]}
+                for name in names
+            ])
+    else:
+        # Unchanged: the listing row already holds them in order
+        names = json.loads(db.execute(
+            select(TherapistListing.specializations).where(TherapistListing.id == therapist_id)
+        ).scalar() or "[]")
+
+    saved = {**row._asdict(), "specializations": names}
+    _save_read_models(db, saved)
+    version = listings.bump_directory_version(db)
+    commit(db, after=lambda: _after_write(version, saved=[saved]))
+    item = dict(saved)
+    item["specialization"] = item.pop("specializations")
+    return item
 
 def delete_therapist(db: Session, therapist_id: int) -> bool:
     therapist = get_therapist(db, therapist_id)
     if not therapist:
         return False
     db.delete(therapist)
-    db.commit()
+    fts.unindex_therapist(db, therapist_id)
+    listings.delete_listing(db, therapist_id)
+    version = listings.bump_directory_version(db)
+    commit(db, after=lambda: _after_write(version, removed=[therapist_id]))
     return True
@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.core.cache import user_cache
+from app.db.writer import commit
+
+def get_user(db: Session, user_id: str) -> Optional[User]:
+    return db.query(User).filter(User.id == user_id).first()
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+def create_user(db: Session, email: str, hashed_password: str, full_name: Optional[str] = None) -> User:
+    db_user = User(email=email, hashed_password=hashed_password, full_name=full_name)
+    db.add(db_user)
+    db.flush()
+    commit(db)
+    db.refresh(db_user)
+    return db_user
+
+def update_user(db: Session, user_id: str, **values) -> bool:
+    """Change a user's fields; cached copies are dropped once committed."""
+    updated = db.execute(
+        update(User).where(User.id == user_id).values(**values)
+    ).rowcount
+    if not updated:
+        return False
+    commit(db, after=lambda: user_cache.pop(user_id))
+    return True
@@ -0,0 +1,258 @@
+import re
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, String, bindparam, column, func, literal_column, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# SQLite FTS5 index over the therapist directory. The rowid of every
+# document is the therapist id, so lookups and deletes never scan.
+THERAPIST_FTS_TABLE = "therapists_fts"
+
+CREATE_THERAPIST_FTS = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {THERAPIST_FTS_TABLE} USING fts5(
+    name,
+    description,
+    specializations,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+BACKFILL_THERAPIST_FTS = f"""
+INSERT INTO {THERAPIST_FTS_TABLE} (rowid, name, description, specializations)
+SELECT
+    t.id,
+    coalesce(t.name, ''),
+    coalesce(t.description, ''),
+    coalesce((
+        SELECT group_concat(s.name, ' ')
+        FROM therapist_specialization ts
+        JOIN specializations s ON s.id = ts.specialization_id
+        WHERE ts.therapist_id = t.id
+    ), '')
+FROM therapists t
+"""
+
+# Column weights for bm25(): name, description, specializations
+THERAPIST_BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+therapists_fts = table(THERAPIST_FTS_TABLE, column("rowid", Integer))
+
+# FTS5 index over journal entries. Journal ids are UUID strings, so each
+# entry gets an integer rowid through a small mapping table. Every document
+# carries its owner as a single token, and every search ANDs that token in,
+# so FTS5 only intersects postings of the searching user's entries.
+JOURNAL_FTS_TABLE = "journals_fts"
+JOURNAL_FTS_ROWS_TABLE = "journal_fts_rows"
+
+CREATE_JOURNAL_FTS_ROWS = f"""
+CREATE TABLE IF NOT EXISTS {JOURNAL_FTS_ROWS_TABLE} (
+    rowid INTEGER PRIMARY KEY,
+    journal_id VARCHAR NOT NULL UNIQUE
+)
+"""
+
+CREATE_JOURNAL_FTS = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {JOURNAL_FTS_TABLE} USING fts5(
+    owner,
+    title,
+    tags,
+    content,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+BACKFILL_JOURNAL_FTS_ROWS = f"""
+INSERT OR IGNORE INTO {JOURNAL_FTS_ROWS_TABLE} (journal_id)
+SELECT id FROM journals
+"""
+
+BACKFILL_JOURNAL_FTS = f"""
+INSERT INTO {JOURNAL_FTS_TABLE} (rowid, owner, title, tags, content)
+SELECT
+    r.rowid,
+    'u' || replace(j.user_id, '-', ''),
+    j.title,
+    coalesce((SELECT group_concat(value, ' ') FROM json_each(j.tags)), ''),
+    j.content
+FROM {JOURNAL_FTS_ROWS_TABLE} r
+JOIN journals j ON j.id = r.journal_id
+"""
+
+journal_rows = table(
+    JOURNAL_FTS_ROWS_TABLE,
+    column("rowid", Integer),
+    column("journal_id", String)
+)
+
+# Column numbers for snippet()
+JOURNAL_CONTENT_COLUMN = 3
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# A quoted phrase, optionally followed by *, or a bare word
+_JOURNAL_TERM_RE = re.compile(r'"([^"]*)"(\*?)|(\w+)', re.UNICODE)
+
+def _table_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}
+    ).first() is not None
+
+def create_search_tables(bind: Engine) -> None:
+    """Create the FTS5 tables, backfilling them the first time they appear."""
+    with bind.begin() as conn:
+        if not _table_exists(conn, THERAPIST_FTS_TABLE):
+            conn.execute(text(CREATE_THERAPIST_FTS))
+            conn.execute(text(BACKFILL_THERAPIST_FTS))
+        if not _table_exists(conn, JOURNAL_FTS_TABLE):
+            conn.execute(text(CREATE_JOURNAL_FTS_ROWS))
+            conn.execute(text(CREATE_JOURNAL_FTS))
+            conn.execute(text(BACKFILL_JOURNAL_FTS_ROWS))
+            conn.execute(text(BACKFILL_JOURNAL_FTS))
+
+def match_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query where every word is a prefix term.
+
+    Words are quoted so user input can never be parsed as FTS5 syntax.
+    Returns None when the input contains nothing searchable.
+    """
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def therapist_match_clause(id_column, query: str):
+    """Return an `id_column IN (...)` clause served by the FTS5 index."""
+    matches = text(
+        f"SELECT rowid FROM {THERAPIST_FTS_TABLE} "
+        f"WHERE {THERAPIST_FTS_TABLE} MATCH :therapist_fts_query"
+    ).bindparams(therapist_fts_query=query).columns(column("rowid", Integer))
+    return id_column.in_(matches)
+
+def therapist_match(query: str):
+    """MATCH predicate for queries that select from `therapists_fts` directly."""
+    return literal_column(THERAPIST_FTS_TABLE).op("MATCH")(query)
+
+def therapist_bm25():
+    """BM25 score of the current match; lower is more relevant."""
+    return func.bm25(literal_column(THERAPIST_FTS_TABLE), *THERAPIST_BM25_WEIGHTS)
+
+_INSERT_THERAPIST_DOC = text(
+    f"INSERT INTO {THERAPIST_FTS_TABLE} "
+    "(rowid, name, description, specializations) "
+    "VALUES (:id, :name, :description, :specializations)"
+)
+
+def index_therapist(db: Session, therapist: dict) -> None:
+    """Replace the FTS document for a therapist; call before committing."""
+    unindex_therapist(db, therapist["id"])
+    index_new_therapists(db, [therapist])
+
+def index_new_therapists(db: Session, therapists: List[dict]) -> None:
+    """Add documents for freshly inserted therapists with one executemany."""
+    db.execute(_INSERT_THERAPIST_DOC, [
+        {
+            "id": t["id"],
+            "name": t["name"] or "",
+            "description": t["description"] or "",
+            "specializations": " ".join(t["specializations"]),
+        }
+        for t in therapists
+    ])
+
+def unindex_therapist(db: Session, therapist_id: int) -> None:
+    db.execute(
+        text(f"DELETE FROM {THERAPIST_FTS_TABLE} WHERE rowid = :id"),
+        {"id": therapist_id}
+    )
+
+def owner_token(user_id: str) -> str:
+    return "u" + user_id.replace("-", "")
+
+def journal_match_query(user_id: str, search: str) -> Optional[str]:
+    """Build the FTS5 query for a user's journal search.
+
+    Quoted text is matched as a phrase ("panic attack"), a trailing * on a
+    phrase makes its last word a prefix, and bare words are prefix terms
+    like the therapist search. Returns None when nothing is searchable.
+    """
+    terms = []
+    for match in _JOURNAL_TERM_RE.finditer(search):
+        phrase, star, word = match.groups()
+        if word is not None:
+            terms.append(f'"{word}"*')
+            continue
+        tokens = _TOKEN_RE.findall(phrase)
+        if tokens:
+            terms.append(f'"{" ".join(tokens)}"{star}')
+    if not terms:
+        return None
+    return f'owner : "{owner_token(user_id)}" AND {{title tags content}} : ({" ".join(terms)})'
+
+def journal_match_rows(query: str):
+    """Selectable of the FTS rowids matching a journal query."""
+    return text(
+        f"SELECT rowid FROM {JOURNAL_FTS_TABLE} "
+        f"WHERE {JOURNAL_FTS_TABLE} MATCH :journal_fts_query"
+    ).bindparams(journal_fts_query=query).columns(column("rowid", Integer))
+
+def journal_snippets(db: Session, query: str, journal_ids: List[str]) -> Dict[str, str]:
+    """Highlighted content snippets for the given matching journals."""
+    if not journal_ids:
+        return {}
+    rows = db.execute(
+        text(
+            f"SELECT r.journal_id, snippet({JOURNAL_FTS_TABLE}, {JOURNAL_CONTENT_COLUMN}, "
+            "'<mark>', '</mark>', '…', 16) "
+            f"FROM {JOURNAL_FTS_TABLE} JOIN {JOURNAL_FTS_ROWS_TABLE} r "
+            f"ON r.rowid = {JOURNAL_FTS_TABLE}.rowid "
+            f"WHERE {JOURNAL_FTS_TABLE} MATCH :query AND r.journal_id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"query": query, "ids": journal_ids}
+    )
+    return dict(rows.all())
+
+_JOURNAL_ROWID = text(
+    f"INSERT INTO {JOURNAL_FTS_ROWS_TABLE} (journal_id) VALUES (:id) "
+    "ON CONFLICT (journal_id) DO UPDATE SET journal_id = excluded.journal_id "
+    "RETURNING rowid"
+)
+
+def index_journal(db: Session, journal: dict) -> None:
+    """Replace the FTS document for a journal entry; call before committing."""
+    rowid = db.execute(_JOURNAL_ROWID, {"id": journal["id"]}).scalar_one()
+    db.execute(text(f"DELETE FROM {JOURNAL_FTS_TABLE} WHERE rowid = :rowid"), {"rowid": rowid})
+    db.execute(
+        text(
+            f"INSERT INTO {JOURNAL_FTS_TABLE} (rowid, owner, title, tags, content) "
+            "VALUES (:rowid, :owner, :title, :tags, :content)"
+        ),
+        {
+            "rowid": rowid,
+            "owner": owner_token(journal["user_id"]),
+            "title": journal["title"],
+            "tags": " ".join(journal["tags"]),
+            "content": journal["content"],
+        }
+    )
+
+def index_new_journals(db: Session, journal_ids: List[str]) -> None:
+    """Index freshly inserted journal rows straight from the table."""
+    db.execute(
+        text(f"INSERT INTO {JOURNAL_FTS_ROWS_TABLE} (journal_id) VALUES (:id)"),
+        [{"id": journal_id} for journal_id in journal_ids]
+    )
+    db.execute(
+        text(BACKFILL_JOURNAL_FTS + " WHERE r.journal_id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": journal_ids}
+    )
+
+def unindex_journal(db: Session, journal_id: str) -> None:
+    db.execute(
+        text(
+            f"DELETE FROM {JOURNAL_FTS_TABLE} WHERE rowid = "
+            f"(SELECT rowid FROM {JOURNAL_FTS_ROWS_TABLE} WHERE journal_id = :id)"
+        ),
+        {"id": journal_id}
+    )
+    db.execute(text(f"DELETE FROM {JOURNAL_FTS_ROWS_TABLE} WHERE journal_id = :id"), {"id": journal_id})
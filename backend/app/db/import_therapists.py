@@ -0,0 +1,34 @@
+import argparse
+import json
+from app.crud.therapist import bulk_create_therapists
+from app.db.session import SessionLocal, engine
+from app.db.fts import create_search_tables
+from app.db.listings import backfill_listings
+from app.models.therapist import Base
+
+# Create all tables
+Base.metadata.create_all(bind=engine)
+create_search_tables(engine)
+backfill_listings(engine)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import therapist profiles from a JSON file")
+    parser.add_argument("path", help="JSON file holding a list of therapist objects")
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        rows = json.load(f)
+
+    db = SessionLocal()
+    try:
+        result = bulk_create_therapists(db, rows)
+        print(f"Imported {result['created']} therapists, {len(result['errors'])} rows rejected")
+        for error in result["errors"]:
+            print(f"  row {error['index']}: {error['error']}")
+    except Exception as e:
+        print(f"An error occurred while importing therapists: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
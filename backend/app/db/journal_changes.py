@@ -0,0 +1,45 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Sequence numbers come from a one-row counter bumped inside the write
+# transaction. SQLite runs one writer at a time, so transactions commit in
+# sequence order and a reader can never see seq n + 1 while n is pending.
+_ALLOCATE = text(
+    "INSERT INTO journal_change_seq (id, value) VALUES (1, :count) "
+    "ON CONFLICT (id) DO UPDATE SET value = value + :count "
+    "RETURNING value"
+)
+
+# Entries written before the sequence existed get numbers in updatedAt
+# order, after any already assigned
+BACKFILL_CHANGE_SEQ = """
+UPDATE journals SET change_seq = (
+    SELECT coalesce((SELECT value FROM journal_change_seq WHERE id = 1), 0) + ordered.position
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY "updatedAt", id) AS position
+        FROM journals
+        WHERE change_seq IS NULL
+    ) AS ordered
+    WHERE ordered.id = journals.id
+)
+WHERE change_seq IS NULL
+"""
+
+SYNC_CHANGE_SEQ_COUNTER = """
+INSERT INTO journal_change_seq (id, value)
+SELECT 1, coalesce(max(change_seq), 0) FROM journals WHERE true
+ON CONFLICT (id) DO UPDATE SET value = max(value, excluded.value)
+"""
+
+def allocate(db: Session, count: int = 1) -> int:
+    """Reserve `count` sequence numbers and return the last one."""
+    return db.execute(_ALLOCATE, {"count": count}).scalar_one()
+
+def backfill_change_seq(bind: Engine) -> None:
+    """Number any entries that were written without a change sequence."""
+    with bind.begin() as conn:
+        pending = conn.execute(text("SELECT 1 FROM journals WHERE change_seq IS NULL LIMIT 1")).first()
+        if pending:
+            conn.execute(text(BACKFILL_CHANGE_SEQ))
+            conn.execute(text(SYNC_CHANGE_SEQ_COUNTER))
@@ -0,0 +1,113 @@
+import json
+from collections import Counter
+from datetime import date
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app.models.journal import Journal, JournalDailyStats, JournalDailyTagStats, count_words
+
+class EntryStats(NamedTuple):
+    """What one entry contributes to its owner's daily aggregates."""
+    day: date
+    words: int
+    tags: frozenset
+
+def entry_stats(created_at, content: str, tags: Iterable[str]) -> EntryStats:
+    return EntryStats(created_at.date(), count_words(content), frozenset(tags))
+
+class _Deltas:
+    """Signed changes to one user's daily rows, written in two upserts."""
+
+    def __init__(self):
+        self.entries = Counter()
+        self.words = Counter()
+        self.tags = Counter()
+
+    def add(self, entry: EntryStats, sign: int = 1) -> None:
+        self.entries[entry.day] += sign
+        self.words[entry.day] += sign * entry.words
+        for tag in entry.tags:
+            self.tags[entry.day, tag] += sign
+
+    def write(self, db, user_id: str) -> None:
+        day_rows = [
+            {"user_id": user_id, "day": day, "entries": self.entries[day], "words": self.words[day]}
+            for day in self.entries
+            if self.entries[day] or self.words[day]
+        ]
+        tag_rows = [
+            {"user_id": user_id, "day": day, "tag": tag, "count": count}
+            for (day, tag), count in self.tags.items()
+            if count
+        ]
+        if day_rows:
+            stmt = insert(JournalDailyStats)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[JournalDailyStats.user_id, JournalDailyStats.day],
+                    set_={
+                        "entries": JournalDailyStats.entries + stmt.excluded.entries,
+                        "words": JournalDailyStats.words + stmt.excluded.words,
+                    }
+                ),
+                day_rows
+            )
+            # Days whose last entry went away
+            db.execute(delete(JournalDailyStats).where(
+                JournalDailyStats.user_id == user_id,
+                JournalDailyStats.day.in_([row["day"] for row in day_rows]),
+                JournalDailyStats.entries <= 0
+            ))
+        if tag_rows:
+            stmt = insert(JournalDailyTagStats)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[JournalDailyTagStats.user_id, JournalDailyTagStats.day, JournalDailyTagStats.tag],
+                    set_={"count": JournalDailyTagStats.count + stmt.excluded.count}
+                ),
+                tag_rows
+            )
+            db.execute(delete(JournalDailyTagStats).where(
+                JournalDailyTagStats.user_id == user_id,
+                JournalDailyTagStats.day.in_({row["day"] for row in tag_rows}),
+                JournalDailyTagStats.count <= 0
+            ))
+
+def add_stats(db: Session, user_id: str, entries: Iterable[EntryStats]) -> None:
+    """Count new entries into the daily aggregates; call before committing."""
+    deltas = _Deltas()
+    for entry in entries:
+        deltas.add(entry)
+    deltas.write(db, user_id)
+
+def save_stats(db: Session, user_id: str, old: Optional[EntryStats], new: Optional[EntryStats]) -> None:
+    """Swap an entry's old contribution for its new one; either may be None."""
+    deltas = _Deltas()
+    if old:
+        deltas.add(old, -1)
+    if new:
+        deltas.add(new)
+    deltas.write(db, user_id)
+
+def backfill_journal_stats(bind: Engine) -> None:
+    """Build the daily aggregates from existing entries if they have never been built."""
+    with bind.begin() as conn:
+        built = conn.execute(select(func.count()).select_from(JournalDailyStats)).scalar()
+        if not built and conn.execute(select(func.count()).select_from(Journal)).scalar():
+            rebuild_journal_stats(conn)
+
+def rebuild_journal_stats(conn: Connection) -> None:
+    """Recompute every user's daily aggregates in one pass over the entries."""
+    conn.execute(delete(JournalDailyStats))
+    conn.execute(delete(JournalDailyTagStats))
+    by_user = {}
+    rows = conn.execute(
+        select(Journal.user_id, Journal.createdAt, Journal.content, Journal._tags)
+        .execution_options(yield_per=1000)
+    )
+    for user_id, created_at, content, tags in rows:
+        by_user.setdefault(user_id, _Deltas()).add(entry_stats(created_at, content, json.loads(tags)))
+    for user_id, deltas in by_user.items():
+        deltas.write(conn, user_id)
@@ -0,0 +1,31 @@
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Connection, Engine
+from app.models.journal import Journal, count_words, make_excerpt
+
+BATCH_SIZE = 500
+
+def fill_journal_summaries(conn: Connection) -> None:
+    """Compute excerpt and word_count for entries that have none, a batch at a time."""
+    journals = Journal.__table__
+    pending = select(journals.c.id, journals.c.content).where(journals.c.excerpt.is_(None)).limit(BATCH_SIZE)
+    # Setting updatedAt to itself keeps its onupdate from touching entries
+    # whose content did not change
+    stmt = (
+        update(journals)
+        .where(journals.c.id == bindparam("journal_id"))
+        .values(updatedAt=journals.c.updatedAt)
+    )
+    while True:
+        # Filled rows drop out of the pending query, so each pass
+        # picks up where the last one stopped
+        batch = conn.execute(pending).all()
+        if not batch:
+            return
+        conn.execute(stmt, [
+            {"journal_id": id_, "excerpt": make_excerpt(content), "word_count": count_words(content)}
+            for id_, content in batch
+        ])
+
+def backfill_journal_summaries(bind: Engine) -> None:
+    with bind.begin() as conn:
+        fill_journal_summaries(conn)
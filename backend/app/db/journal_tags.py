@@ -0,0 +1,71 @@
+from collections import Counter
+from typing import Iterable, Tuple
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.journal import Journal, JournalTag, JournalTagCount
+
+BACKFILL_JOURNAL_TAGS = """
+INSERT OR IGNORE INTO journal_tags (journal_id, tag, user_id)
+SELECT j.id, t.value, j.user_id
+FROM journals j, json_each(j.tags) t
+WHERE t.type = 'text'
+"""
+
+BACKFILL_JOURNAL_TAG_COUNTS = """
+INSERT INTO journal_tag_counts (user_id, tag, count)
+SELECT user_id, tag, count(*)
+FROM journal_tags
+GROUP BY user_id, tag
+"""
+
+def backfill_journal_tags(bind: Engine) -> None:
+    """Populate the tag tables from the JSON column if they have never been built."""
+    with bind.begin() as conn:
+        tagged = conn.execute(select(func.count()).select_from(JournalTag)).scalar()
+        if not tagged and conn.execute(select(func.count()).select_from(Journal)).scalar():
+            conn.execute(text(BACKFILL_JOURNAL_TAGS))
+            conn.execute(text(BACKFILL_JOURNAL_TAG_COUNTS))
+
+def save_tags(db: Session, user_id: str, journal_id: str, old_tags: Iterable[str], new_tags: Iterable[str]) -> None:
+    """Apply the difference between an entry's old and new tags; call before committing."""
+    old, new = set(old_tags), set(new_tags)
+    added, removed = new - old, old - new
+    if removed:
+        db.execute(delete(JournalTag).where(
+            JournalTag.journal_id == journal_id,
+            JournalTag.tag.in_(removed)
+        ))
+        db.execute(
+            update(JournalTagCount)
+            .where(JournalTagCount.user_id == user_id, JournalTagCount.tag.in_(removed))
+            .values(count=JournalTagCount.count - 1)
+        )
+        db.execute(delete(JournalTagCount).where(
+            JournalTagCount.user_id == user_id,
+            JournalTagCount.tag.in_(removed),
+            JournalTagCount.count <= 0
+        ))
+    if added:
+        add_tags(db, user_id, [(journal_id, added)])
+
+def add_tags(db: Session, user_id: str, entries: Iterable[Tuple[str, Iterable[str]]]) -> None:
+    """Tag many entries of one user with one executemany per table."""
+    links = [
+        {"journal_id": journal_id, "tag": tag, "user_id": user_id}
+        for journal_id, tags in entries
+        for tag in set(tags)
+    ]
+    if not links:
+        return
+    db.execute(insert(JournalTag), links)
+    counts = Counter(link["tag"] for link in links)
+    stmt = insert(JournalTagCount)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[JournalTagCount.user_id, JournalTagCount.tag],
+            set_={"count": JournalTagCount.count + stmt.excluded.count}
+        ),
+        [{"user_id": user_id, "tag": tag, "count": count} for tag, count in counts.items()]
+    )
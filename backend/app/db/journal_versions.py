@@ -0,0 +1,22 @@
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.models.journal import JournalVersion
+
+# Like the directory version, a user's journal version lives in the
+# database and is bumped inside the write transaction, so every process
+# agrees on it and it never runs ahead of the entries it describes
+_BUMP = text(
+    "INSERT INTO journal_versions (user_id, value) VALUES (:user_id, 1) "
+    "ON CONFLICT (user_id) DO UPDATE SET value = value + 1 "
+    "RETURNING value"
+)
+
+def bump(db: Session, user_id: str) -> int:
+    """Mark a user's entries as changed and return the new version; call before committing."""
+    return db.execute(_BUMP, {"user_id": user_id}).scalar_one()
+
+def version_query(user_id: str):
+    return select(JournalVersion.value).where(JournalVersion.user_id == user_id)
+
+def get_version(db: Session, user_id: str) -> int:
+    return db.execute(version_query(user_id)).scalar() or 0
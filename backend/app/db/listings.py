@@ -0,0 +1,76 @@
+import json
+from typing import List
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.therapist import DirectoryVersion, Therapist, TherapistListing
+
+BACKFILL_THERAPIST_LISTINGS = """
+INSERT INTO therapist_listings
+    (id, name, category, qualification, experience, experience_years, description, rating, version, specializations)
+SELECT
+    t.id, t.name, t.category, t.qualification, t.experience, t.experience_years, t.description, t.rating, t.version,
+    coalesce((
+        SELECT json_group_array(s.name)
+        FROM therapist_specialization ts
+        JOIN specializations s ON s.id = ts.specialization_id
+        WHERE ts.therapist_id = t.id
+    ), '[]')
+FROM therapists t
+"""
+
+# The directory version lives in the database so every process serving or
+# writing the directory sees the same one. Bumped inside the write
+# transaction, it can never run ahead of the rows it describes.
+_BUMP_DIRECTORY_VERSION = text(
+    "INSERT INTO directory_version (id, value) VALUES (1, 1) "
+    "ON CONFLICT (id) DO UPDATE SET value = value + 1 "
+    "RETURNING value"
+)
+
+def bump_directory_version(db: Session) -> int:
+    """Mark the directory as changed and return its new version; call before committing."""
+    return db.execute(_BUMP_DIRECTORY_VERSION).scalar_one()
+
+DIRECTORY_VERSION = select(DirectoryVersion.value).where(DirectoryVersion.id == 1)
+
+def get_directory_version(db: Session) -> int:
+    return db.execute(DIRECTORY_VERSION).scalar() or 0
+
+def backfill_listings(bind: Engine) -> None:
+    """Populate the read model from `therapists` if it has never been built."""
+    with bind.begin() as conn:
+        listed = conn.execute(select(func.count()).select_from(TherapistListing)).scalar()
+        if not listed and conn.execute(select(func.count()).select_from(Therapist)).scalar():
+            conn.execute(text(BACKFILL_THERAPIST_LISTINGS))
+
+def _listing_params(doc: dict) -> dict:
+    return {
+        "id": doc["id"],
+        "name": doc["name"],
+        "category": doc["category"],
+        "qualification": doc["qualification"],
+        "experience": doc["experience"],
+        "experience_years": doc["experience_years"],
+        "description": doc["description"],
+        "rating": doc["rating"],
+        "version": doc["version"],
+        "specializations": json.dumps(doc["specializations"]),
+    }
+
+def save_listings(db: Session, docs: List[dict]) -> None:
+    """Insert or replace read-model rows; call before committing."""
+    stmt = insert(TherapistListing)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TherapistListing.id],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in TherapistListing.__table__.columns
+            if column.name != "id"
+        }
+    )
+    db.execute(stmt, [_listing_params(doc) for doc in docs])
+
+def delete_listing(db: Session, therapist_id: int) -> None:
+    db.execute(delete(TherapistListing).where(TherapistListing.id == therapist_id))
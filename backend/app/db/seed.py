@@ -2,6 +2,12 @@ from sqlalchemy.orm import Session
 from app.crud.therapist import create_therapist
 from app.schemas.therapist import TherapistCreate
 from app.db.session import SessionLocal, engine
+from app.db.fts import create_search_tables, index_journal
+from app.db.listings import backfill_listings
+from app.db.journal_changes import backfill_change_seq
+from app.db.journal_summaries import backfill_journal_summaries
+from app.db.journal_stats import add_stats, backfill_journal_stats, entry_stats
+from app.db.journal_tags import backfill_journal_tags, save_tags
 from app.models.therapist import Base
 from app.models.journal import Journal
 from app.models.user import User
@@ -10,6 +16,12 @@ import uuid
 
 # Create all tables
 Base.metadata.create_all(bind=engine)
+create_search_tables(engine)
+backfill_listings(engine)
+backfill_journal_tags(engine)
+backfill_journal_stats(engine)
+backfill_change_seq(engine)
+backfill_journal_summaries(engine)
 
 initial_therapists = [
   {
@@ -351,7 +363,7 @@ def seed_db(db: Session) -> None:
     test_user = User(
         id=generate_uuid(),
         email="test@example.com",
-        hashed_password="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # "password"
+        hashed_password="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # "secret"
         full_name="Test User",
         createdAt=datetime.utcnow(),
         updatedAt=datetime.utcnow()
@@ -376,8 +388,19 @@ def seed_db(db: Session) -> None:
             user_id=test_user.id
         )
         db.add(journal)
+        index_journal(db, {
+            "id": journal.id,
+            "user_id": journal.user_id,
+            "title": journal.title,
+            "tags": journal.tags,
+            "content": journal.content,
+        })
+        save_tags(db, test_user.id, journal.id, [], journal.tags)
+        add_stats(db, test_user.id, [entry_stats(created_at, journal.content, journal.tags)])
     
     db.commit()
+    backfill_change_seq(engine)
+    backfill_journal_summaries(engine)
 
 def main() -> None:
     db = SessionLocal()
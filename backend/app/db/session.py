@@ -1,9 +1,41 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
+def configure_sqlite(engine: Engine) -> None:
+    """Open every connection of `engine` in WAL mode with a busy timeout.
+
+    In the default rollback journal an open read, such as a streaming
+    export, holds a lock that keeps every other connection from
+    committing. Under WAL readers and the writer no longer block each
+    other, and the timeout covers the short waits between writers.
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+        cursor.close()
+
 engine = create_engine(
     settings.SQLITE_URL,
     connect_args={"check_same_thread": False}  # Required for SQLite
 )
+configure_sqlite(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# The same database through aiosqlite for async handlers: statements run on
+# the driver's own thread, so the event loop keeps serving other requests.
+# aiosqlite defaults to no pooling; keep connections (and their threads)
+# around instead, and wait for a free one without blocking the loop
+async_engine = create_async_engine(
+    make_url(settings.SQLITE_URL).set(drivername="sqlite+aiosqlite"),
+    poolclass=AsyncAdaptedQueuePool
+)
+configure_sqlite(async_engine.sync_engine)
+# Results are read after run_sync returns, where expired attributes could
+# not be loaded, so commits keep them
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,218 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.db.session import SessionLocal, configure_sqlite
+
+# Set on a session's info while it runs a write inside a group commit
+_PENDING_HOOKS = "group_commit_hooks"
+
+def commit(db: Session, after: Optional[Callable[[], None]] = None) -> None:
+    """Commit a write, then run `after` once it is durable.
+
+    Inside a group commit the enclosing batch owns the transaction, so
+    this only flushes and queues `after` to run when the whole batch has
+    committed.
+    """
+    hooks = db.info.get(_PENDING_HOOKS)
+    if hooks is None:
+        db.commit()
+        if after:
+            after()
+        return
+    db.flush()
+    if after:
+        hooks.append(after)
+
+def _writer_engine():
+    engine = create_engine(
+        settings.SQLITE_URL,
+        connect_args={"check_same_thread": False}
+    )
+    configure_sqlite(engine)
+
+    # pysqlite's own transaction handling would let RELEASE of the first
+    # SAVEPOINT commit the batch, so take over BEGIN ourselves. IMMEDIATE
+    # takes the write lock up front instead of upgrading mid-batch.
+    @event.listens_for(engine, "connect")
+    def _disable_implicit_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+class _Write:
+    __slots__ = ("fn", "future", "hooks")
+
+    def __init__(self, fn: Callable[[Session], Any]):
+        self.fn = fn
+        self.future: Future = Future()
+        self.hooks: List[Callable[[], None]] = []
+
+_STOP = object()
+
+class GroupCommitWriter:
+    """Single writer thread that coalesces concurrent writes into one commit.
+
+    Each write is a function of a session. After the first write arrives,
+    the writer waits up to `window` seconds for more, up to `max_batch`.
+    It runs each write in its own SAVEPOINT, so a failing write only
+    rolls back itself, and then commits the batch once. Callers get their
+    own result or exception once the batch is durable and its after-commit
+    hooks have run.
+    """
+
+    def __init__(self, window: float, max_batch: int, enabled: bool = True):
+        self.window = window
+        self.max_batch = max_batch
+        self.enabled = enabled
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._sessions: Optional[sessionmaker] = None
+        # Resolved once the batch being committed has run its hooks
+        self._in_flight: Optional[Future] = None
+        self.batches = 0
+        self.writes = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._sessions = sessionmaker(bind=_writer_engine(), autoflush=False)
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Finish queued writes and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        write = _Write(fn)
+        if not self.enabled:
+            self._run_alone(write)
+            return write.future
+        self.start()
+        self._queue.put(write)
+        return write.future
+
+    def run(self, fn: Callable[[Session], Any]) -> Any:
+        """Submit a write and block until its batch has committed."""
+        return self.submit(fn).result()
+
+    async def run_async(self, fn: Callable[[Session], Any]) -> Any:
+        return await asyncio.wrap_future(self.submit(fn))
+
+    async def settled(self) -> None:
+        """Wait until the batch being committed, if any, has run its hooks.
+
+        A reader that sees a write's effects in the database can wait on
+        this to see them in what the hooks maintain too.
+        """
+        in_flight = self._in_flight
+        if in_flight is not None:
+            await asyncio.wrap_future(in_flight)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "writes": self.writes,
+            "avg_batch": self.writes / self.batches if self.batches else 0.0,
+        }
+
+    def _run_alone(self, write: _Write) -> None:
+        # Group commit disabled: the write commits on its own, like a
+        # request session would
+        db = SessionLocal()
+        try:
+            write.future.set_result(write.fn(db))
+        except Exception as exc:
+            db.rollback()
+            write.future.set_exception(exc)
+        finally:
+            db.close()
+
+    def _gather(self) -> Optional[List[_Write]]:
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                write = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if write is _STOP:
+                # Put it back so the loop stops after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(write)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._gather()
+            if batch is None:
+                return
+            self._in_flight = Future()
+            try:
+                self._commit_batch(batch)
+            finally:
+                in_flight, self._in_flight = self._in_flight, None
+                in_flight.set_result(None)
+
+    def _commit_batch(self, batch: List[_Write]) -> None:
+        db = self._sessions()
+        results = {}
+        try:
+            with db.begin():
+                for write in batch:
+                    db.info[_PENDING_HOOKS] = write.hooks
+                    try:
+                        with db.begin_nested():
+                            results[write] = write.fn(db)
+                    except Exception as exc:
+                        write.future.set_exception(exc)
+                    finally:
+                        db.info.pop(_PENDING_HOOKS, None)
+                        # Start the next write from an empty identity map,
+                        # as if it had a session of its own
+                        db.expunge_all()
+        except Exception as exc:
+            # The commit itself failed: nothing in the batch is durable
+            for write in batch:
+                if not write.future.done():
+                    write.future.set_exception(exc)
+            return
+        finally:
+            db.close()
+
+        self.batches += 1
+        self.writes += len(batch)
+        for write, result in results.items():
+            try:
+                for hook in write.hooks:
+                    hook()
+            except Exception as exc:
+                write.future.set_exception(exc)
+            else:
+                write.future.set_result(result)
+
+group_writer = GroupCommitWriter(
+    window=settings.WRITE_BATCH_WINDOW,
+    max_batch=settings.WRITE_BATCH_MAX,
+    enabled=settings.WRITE_BATCH_ENABLED
+)
@@ -1,14 +1,46 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import therapists, journals
+from app.api.endpoints import auth, therapists, journals
 from app.core.config import settings
-from app.db.session import engine
+from app.db.session import async_engine, engine, SessionLocal
+from app.db.fts import create_search_tables
+from app.db.listings import backfill_listings
+from app.db.journal_changes import backfill_change_seq
+from app.db.journal_summaries import backfill_journal_summaries
+from app.db.journal_stats import backfill_journal_stats
+from app.db.journal_tags import backfill_journal_tags
+from app.db.writer import group_writer
+from app.services.hashing import password_hasher
 from app.models.therapist import Base
+from app.crud.therapist import build_indexes
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+create_search_tables(engine)
+backfill_listings(engine)
+backfill_journal_tags(engine)
+backfill_journal_stats(engine)
+backfill_change_seq(engine)
+backfill_journal_summaries(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the in-memory directory indexes before serving requests
+    db = SessionLocal()
+    try:
+        build_indexes(db)
+    finally:
+        db.close()
+    group_writer.start()
+    yield
+    # Let queued writes commit before shutting down
+    group_writer.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
@@ -24,6 +56,12 @@ app.add_middleware(
 )
 
 # Include routers
+app.include_router(
+    auth.router,
+    prefix=settings.API_V1_STR,
+    tags=["auth"]
+)
+
 app.include_router(
     therapists.router,
     prefix=f"{settings.API_V1_STR}/therapists",
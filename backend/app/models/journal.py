@@ -1,13 +1,32 @@
 from datetime import datetime
+from typing import Optional
 import uuid
 import json
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+import re
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 def generate_uuid():
     return str(uuid.uuid4())
 
+EXCERPT_LENGTH = 200
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def count_words(text: Optional[str]) -> int:
+    return len((text or "").split())
+
+def make_excerpt(content: Optional[str], length: int = EXCERPT_LENGTH) -> str:
+    """First `length` characters of the content on one line, cut at a word."""
+    text = _WHITESPACE_RE.sub(" ", content or "").strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip(" ,.;:") + "…"
+
 class Journal(Base):
     __tablename__ = "journals"
 
@@ -17,17 +36,100 @@ class Journal(Base):
     _tags = Column('tags', Text, nullable=False, default='[]')  # Store tags as JSON string
     createdAt = Column(DateTime, default=datetime.utcnow, nullable=False)
     updatedAt = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Position in the global change sequence, reassigned on every write
+    change_seq = Column(Integer)
+    # Computed from content on every write so list views can skip content
+    excerpt = Column(String)
+    word_count = Column(Integer)
+    # Bumped on every update; conditional writes compare against it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Foreign key to user
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="journals")
 
+    __table_args__ = (
+        # Serves the per-user, newest-first list and its keyset cursor
+        Index("ix_journals_user_id_updatedAt_id", "user_id", "updatedAt", "id"),
+        # Serves delta sync: a user's entries changed after a sequence number
+        Index("ix_journals_user_id_change_seq", "user_id", "change_seq"),
+    )
+
     @property
     def tags(self):
         """Convert JSON string to list when accessing tags"""
-        return json.loads(self._tags)
+        # Parse once per distinct stored value rather than on every access
+        cached = self.__dict__.get("_tags_cache")
+        if cached is None or cached[0] is not self._tags:
+            cached = self.__dict__["_tags_cache"] = (self._tags, json.loads(self._tags))
+        return list(cached[1])
 
     @tags.setter
     def tags(self, value):
         """Convert list to JSON string when setting tags"""
         self._tags = json.dumps(value)
+
+class JournalTag(Base):
+    """One row per distinct tag on an entry, for exact tag filtering."""
+    __tablename__ = "journal_tags"
+
+    journal_id = Column(String, ForeignKey("journals.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_journal_tags_user_id_tag", "user_id", "tag"),
+    )
+
+class JournalTagCount(Base):
+    """Per-user tag usage, maintained alongside journal_tags on every write."""
+    __tablename__ = "journal_tag_counts"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class JournalDailyStats(Base):
+    """Entries and words a user wrote per day, keyed by the entry's createdAt."""
+    __tablename__ = "journal_daily_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    entries = Column(Integer, nullable=False, default=0)
+    words = Column(Integer, nullable=False, default=0)
+
+class JournalDailyTagStats(Base):
+    """Tag usage per user and day, for tag frequency over time."""
+    __tablename__ = "journal_daily_tag_stats"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    tag = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class JournalChangeSeq(Base):
+    """Single-row counter handing out journal change sequence numbers."""
+    __tablename__ = "journal_change_seq"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class JournalVersion(Base):
+    """Per-user counter bumped inside every write to the user's entries."""
+    __tablename__ = "journal_versions"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class JournalTombstone(Base):
+    """Marks a deleted entry so incremental sync can report the deletion."""
+    __tablename__ = "journal_tombstones"
+
+    journal_id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    change_seq = Column(Integer, nullable=False)
+    deletedAt = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_journal_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
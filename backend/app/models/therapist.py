@@ -1,7 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, Table, ForeignKey
+import re
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Float, Table, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
+_YEARS_RE = re.compile(r"(\d+)\s*(month)?", re.IGNORECASE)
+
+def parse_experience_years(experience: Optional[str]) -> Optional[int]:
+    """Whole years from free text such as "15 years" or "18 months"."""
+    match = _YEARS_RE.search(experience or "")
+    if not match:
+        return None
+    value = int(match.group(1))
+    return value // 12 if match.group(2) else value
+
 # Association table for therapist-specialization many-to-many relationship
 therapist_specialization = Table(
     'therapist_specialization',
@@ -29,11 +41,47 @@ class Therapist(Base):
     category = Column(String, index=True)
     qualification = Column(String)
     experience = Column(String)
+    experience_years = Column(Integer)  # Parsed from experience on write
     description = Column(String)
     rating = Column(Float)
+    # Bumped on every update; conditional writes compare against it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     specializations = relationship(
         "Specialization",
         secondary=therapist_specialization,
         back_populates="therapists"
     )
+
+class TherapistListing(Base):
+    """Denormalized read model of the directory.
+
+    One flat row per therapist with its specialization names stored as a
+    JSON array, kept in step with `therapists` by the therapist CRUD
+    functions inside the same transaction.
+    """
+    __tablename__ = "therapist_listings"
+    __table_args__ = (
+        Index("ix_therapist_listings_category_experience_years", "category", "experience_years"),
+        Index("ix_therapist_listings_category_rating", "category", "rating"),
+        Index("ix_therapist_listings_experience_years", "experience_years"),
+        Index("ix_therapist_listings_rating", "rating"),
+    )
+
+    id = Column(Integer, primary_key=True)  # Same value as therapists.id
+    name = Column(String)
+    category = Column(String, index=True)
+    qualification = Column(String)
+    experience = Column(String)
+    experience_years = Column(Integer)
+    description = Column(String)
+    rating = Column(Float)
+    specializations = Column(Text, nullable=False, default='[]')  # JSON array of names
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+class DirectoryVersion(Base):
+    """Single-row counter bumped inside every directory write transaction."""
+    __tablename__ = "directory_version"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
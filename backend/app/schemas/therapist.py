@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 class TherapistBase(BaseModel):
@@ -27,10 +27,14 @@ class TherapistUpdate(TherapistBase):
     description: Optional[str] = None
     rating: Optional[float] = None
     specialization: Optional[List[str]] = None
+    # When set, the update is rejected if the therapist has changed since
+    version: Optional[int] = None
 
 class Therapist(TherapistBase):
     id: int
     specialization: List[str]
+    experience_years: Optional[int] = None
+    version: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -43,12 +47,35 @@ class Therapist(TherapistBase):
             obj.__dict__['specialization'] = [s.name for s in obj.specializations]
         return super().from_orm(obj)
 
+class TherapistRecommendation(Therapist):
+    score: float
+
 class TherapistPagination(BaseModel):
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
     page: int
     per_page: int
     items: List[Therapist]
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
     class Config:
         from_attributes = True
+
+class TherapistCursorPage(BaseModel):
+    per_page: int
+    items: List[Therapist]
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None
+
+    class Config:
+        from_attributes = True
+
+class TherapistImportError(BaseModel):
+    index: int
+    error: str
+
+class TherapistImportResult(BaseModel):
+    created: int
+    ids: List[int]
+    errors: List[TherapistImportError]
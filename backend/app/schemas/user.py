@@ -0,0 +1,16 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
+class UserCreate(BaseModel):
+    email: str = Field(..., example="someone@example.com")
+    # bcrypt only looks at the first 72 bytes
+    password: str = Field(..., min_length=8, max_length=72)
+    full_name: Optional[str] = None
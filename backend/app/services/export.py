@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, Sequence
+
+# Rows are serialized in groups so each streamed chunk is a reasonable size
+CHUNK_ROWS = 200
+
+def _grouped(rows: Iterable[dict], size: int) -> Iterator[list]:
+    group = []
+    for row in rows:
+        group.append(row)
+        if len(group) == size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+def ndjson_chunks(rows: Iterable[dict]) -> Iterator[bytes]:
+    for group in _grouped(rows, CHUNK_ROWS):
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in group).encode()
+
+def csv_chunks(rows: Iterable[dict], fields: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for group in _grouped(rows, CHUNK_ROWS):
+        writer.writerows(group)
+        yield buffer.getvalue().encode()
+        # Reuse one buffer so memory stays bounded by a single chunk
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: nothing to export
+        yield buffer.getvalue().encode()
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a gzip file as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
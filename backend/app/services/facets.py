@@ -0,0 +1,91 @@
+import math
+import threading
+from typing import Dict, Iterable, List, Optional
+
+FACETS = ("category", "specialization", "rating")
+
+def rating_bucket(rating: Optional[float]) -> Optional[str]:
+    """Half-star bucket a rating falls into, e.g. 4.7 -> "4.5"."""
+    if rating is None:
+        return None
+    return f"{math.floor(rating * 2) / 2:.1f}"
+
+def ids_to_mask(ids: Iterable[int]) -> int:
+    bits = bytearray()
+    for id_ in ids:
+        byte = id_ >> 3
+        if byte >= len(bits):
+            bits.extend(bytes(byte - len(bits) + 1))
+        bits[byte] |= 1 << (id_ & 7)
+    return int.from_bytes(bits, "little")
+
+class FacetIndex:
+    """Per-facet-value bitmaps of therapist ids.
+
+    Each facet value maps to an int used as a bitset, so counting a facet
+    value within a filtered result set is one AND plus a popcount and
+    needs no query at all.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._docs: Dict[int, Dict[str, List[str]]] = {}
+
+    def _values(self, category, rating, specializations) -> Dict[str, List[str]]:
+        bucket = rating_bucket(rating)
+        return {
+            "category": [category] if category else [],
+            "specialization": sorted(set(specializations)),
+            "rating": [bucket] if bucket else [],
+        }
+
+    def _unlink(self, therapist_id: int) -> None:
+        doc = self._docs.pop(therapist_id, None)
+        if not doc:
+            return
+        bit = 1 << therapist_id
+        for facet, values in doc.items():
+            postings = self._postings[facet]
+            for value in values:
+                mask = postings[value] & ~bit
+                if mask:
+                    postings[value] = mask
+                else:
+                    del postings[value]
+
+    def upsert(self, therapist_id: int, category, rating, specializations) -> None:
+        with self._lock:
+            self._unlink(therapist_id)
+            doc = self._values(category, rating, specializations)
+            bit = 1 << therapist_id
+            for facet, values in doc.items():
+                postings = self._postings[facet]
+                for value in values:
+                    postings[value] = postings.get(value, 0) | bit
+            self._docs[therapist_id] = doc
+
+    def remove(self, therapist_id: int) -> None:
+        with self._lock:
+            self._unlink(therapist_id)
+
+    def replace_with(self, other: "FacetIndex") -> None:
+        """Take over the contents of `other`, built while this one served reads."""
+        with self._lock:
+            self._postings = other._postings
+            self._docs = other._docs
+
+    def counts(self, facets: Iterable[str], mask: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """Count every value of the requested facets, within `mask` if given."""
+        with self._lock:
+            result = {}
+            for facet in facets:
+                counts = {}
+                for value, postings in self._postings[facet].items():
+                    count = (postings if mask is None else postings & mask).bit_count()
+                    if count:
+                        counts[value] = count
+                result[facet] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+            return result
+
+facet_index = FacetIndex()
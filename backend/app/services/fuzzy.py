@@ -0,0 +1,107 @@
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def words(text: str) -> List[str]:
+    return [word.lower() for word in _WORD_RE.findall(text or "")]
+
+def trigrams(word: str) -> Set[str]:
+    # Pad like pg_trgm so short words and word boundaries still produce grams
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Typo-tolerant word lookup for the therapist directory.
+
+    Words from each document are indexed by their trigrams. A query word is
+    compared only against vocabulary words sharing at least one trigram
+    with it, so search cost depends on the vocabulary, not the row count.
+    """
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._gram_words: Dict[str, Set[str]] = defaultdict(set)
+        self._word_grams: Dict[str, Set[str]] = {}
+        self._word_docs: Dict[str, Set[int]] = defaultdict(set)
+        self._doc_words: Dict[int, Set[str]] = {}
+
+    def _unlink(self, doc_id: int) -> None:
+        for word in self._doc_words.pop(doc_id, ()):
+            docs = self._word_docs[word]
+            docs.discard(doc_id)
+            if docs:
+                continue
+            # Last document using this word: drop it from the vocabulary
+            del self._word_docs[word]
+            for gram in self._word_grams.pop(word):
+                self._gram_words[gram].discard(word)
+                if not self._gram_words[gram]:
+                    del self._gram_words[gram]
+
+    def upsert(self, doc_id: int, texts: Iterable[str]) -> None:
+        doc_words = {word for text in texts for word in words(text)}
+        with self._lock:
+            self._unlink(doc_id)
+            for word in doc_words:
+                if word not in self._word_grams:
+                    grams = trigrams(word)
+                    self._word_grams[word] = grams
+                    for gram in grams:
+                        self._gram_words[gram].add(word)
+                self._word_docs[word].add(doc_id)
+            self._doc_words[doc_id] = doc_words
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self._unlink(doc_id)
+
+    def replace_with(self, other: "TrigramIndex") -> None:
+        """Take over the contents of `other`, built while this one served reads."""
+        with self._lock:
+            self._gram_words = other._gram_words
+            self._word_grams = other._word_grams
+            self._word_docs = other._word_docs
+            self._doc_words = other._doc_words
+
+    def _similar_words(self, word: str) -> Dict[str, float]:
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._gram_words.get(gram, ()))
+        similar = {}
+        for candidate, common in shared.items():
+            # Jaccard similarity of the two trigram sets
+            score = common / (len(grams) + len(self._word_grams[candidate]) - common)
+            if score >= self.threshold:
+                similar[candidate] = score
+        return similar
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """Return (doc_id, score) pairs ranked by similarity to the query.
+
+        A document's score averages, over the query words, the similarity
+        of its closest matching word, so every word counts.
+        """
+        query_words = list(dict.fromkeys(words(query)))
+        if not query_words:
+            return []
+        scores: Dict[int, float] = defaultdict(float)
+        with self._lock:
+            for word in query_words:
+                best: Dict[int, float] = {}
+                for candidate, score in self._similar_words(word).items():
+                    for doc_id in self._word_docs[candidate]:
+                        if score > best.get(doc_id, 0.0):
+                            best[doc_id] = score
+                for doc_id, score in best.items():
+                    scores[doc_id] += score
+        return sorted(
+            ((doc_id, score / len(query_words)) for doc_id, score in scores.items()),
+            key=lambda item: (-item[1], item[0])
+        )
+
+fuzzy_index = TrigramIndex()
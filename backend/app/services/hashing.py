@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+from app.core.config import settings
+from app.core import security
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the queue is full."""
+
+class HashingPool:
+    """Bounded thread pool for password hashing and verification.
+
+    bcrypt releases the GIL while it works, so the workers hash in
+    parallel without holding up the event loop or the request threadpool.
+    At most `workers + max_queue` jobs are admitted at once; beyond that
+    `submit` raises PoolSaturated straight away instead of letting logins
+    queue up behind each other.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._running = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PoolSaturated("Password hashing pool is saturated")
+        queued_at = time.monotonic()
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        def job():
+            started = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._wait_seconds += started - queued_at
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.monotonic() - started
+
+        def release(future: Future):
+            # Runs however the job ends, including a queued job cancelled
+            # before it started (as when the awaiting request goes away),
+            # which never runs `job` at all
+            with self._lock:
+                self._in_flight -= 1
+                if future.cancelled():
+                    self._cancelled += 1
+                else:
+                    self._completed += 1
+            self._slots.release()
+
+        try:
+            future = self._pool().submit(job)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "peak_in_flight": self._peak_in_flight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+                "avg_wait_ms": 1000 * self._wait_seconds / self._completed if self._completed else 0.0,
+                "avg_run_ms": 1000 * self._run_seconds / self._completed if self._completed else 0.0,
+            }
+
+password_hasher = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE
+)
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(security.get_password_hash, password)
+
+async def verify_password(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """(valid, replacement hash or None), computed on the hashing pool."""
+    return await password_hasher.run(security.verify_and_update_password, password, hashed_password)
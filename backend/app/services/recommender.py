@@ -0,0 +1,161 @@
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+import numpy as np
+from app.services.fuzzy import words
+
+# Journal vocabulary that never appears in specialization names, mapped to
+# the words that do
+TAG_SYNONYMS = {
+    "sleep": ("sleep", "insomnia"),
+    "insomnia": ("insomnia", "sleep"),
+    "anxious": ("anxiety",),
+    "panic": ("anxiety", "phobia"),
+    "worry": ("anxiety",),
+    "sad": ("depression",),
+    "sadness": ("depression",),
+    "lonely": ("depression",),
+    "loss": ("loss", "grief", "bereavement"),
+    "grief": ("grief", "bereavement", "loss"),
+    "alcohol": ("substance", "addiction"),
+    "drinking": ("substance", "addiction"),
+    "smoking": ("smoking", "substance"),
+    "work": ("workplace", "burnout"),
+    "job": ("workplace", "burnout"),
+    "anger": ("anger", "impulse"),
+    "focus": ("focus", "adhd"),
+    "marriage": ("couple", "relationship"),
+    "partner": ("couple", "relationship"),
+}
+
+def _stem(word: str) -> str:
+    # Enough to line up plurals like "disorders"/"disorder"; both sides of
+    # every comparison go through it
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+def _terms(text: str) -> Set[str]:
+    return {_stem(word) for word in words(text)}
+
+class TherapistRecommender:
+    """Therapist x specialization matrix scored against journal tags.
+
+    Rows are therapists and columns specializations, each row scaled to
+    unit length. A user's tag counts become a weight per specialization,
+    so scoring every therapist is a single matrix-vector product. Rows and
+    columns are updated in place as therapists change; storage grows by
+    doubling and removed rows are filled by the last one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._columns: Dict[str, int] = {}
+        self._column_terms: List[Set[str]] = []
+        self._rows: Dict[int, int] = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._ratings = np.zeros(0, dtype=np.float32)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _reserve(self, rows: int, columns: int) -> None:
+        capacity, width = self._matrix.shape
+        if rows <= capacity and columns <= width:
+            return
+        capacity = max(rows, capacity * 2 if rows > capacity else capacity, 64)
+        width = max(columns, width * 2 if columns > width else width, 64)
+        matrix = np.zeros((capacity, width), dtype=np.float32)
+        matrix[:len(self._rows), :self._matrix.shape[1]] = self._matrix[:len(self._rows)]
+        self._matrix = matrix
+        self._ids = np.resize(self._ids, capacity)
+        self._ratings = np.resize(self._ratings, capacity)
+
+    def _column(self, specialization: str) -> int:
+        column = self._columns.get(specialization)
+        if column is None:
+            column = self._columns[specialization] = len(self._column_terms)
+            self._column_terms.append(_terms(specialization))
+        return column
+
+    def upsert(self, therapist_id: int, specializations: Iterable[str], rating: Optional[float]) -> None:
+        with self._lock:
+            columns = sorted({self._column(name) for name in specializations})
+            row = self._rows.get(therapist_id, len(self._rows))
+            self._reserve(row + 1, len(self._column_terms))
+            self._rows[therapist_id] = row
+            self._ids[row] = therapist_id
+            self._ratings[row] = rating or 0.0
+            self._matrix[row] = 0.0
+            if columns:
+                self._matrix[row, columns] = 1.0 / np.sqrt(len(columns))
+
+    def remove(self, therapist_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(therapist_id, None)
+            if row is None:
+                return
+            last = len(self._rows)
+            if row != last:
+                # Move the last row into the hole to keep rows contiguous
+                moved_id = int(self._ids[last])
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved_id
+                self._ratings[row] = self._ratings[last]
+                self._rows[moved_id] = row
+            self._matrix[last] = 0.0
+
+    def replace_with(self, other: "TherapistRecommender") -> None:
+        """Take over the contents of `other`, built while this one served reads."""
+        with self._lock:
+            self._columns = other._columns
+            self._column_terms = other._column_terms
+            self._rows = other._rows
+            self._ids = other._ids
+            self._ratings = other._ratings
+            self._matrix = other._matrix
+
+    def _weights_for(self, tag: str) -> Dict[int, float]:
+        # A tag matches a specialization by the share of its words that
+        # appear in the specialization's name. Tags are user input, so
+        # this is worked out per request rather than remembered.
+        tag_words = [
+            {_stem(alt) for alt in TAG_SYNONYMS.get(word, (word,))}
+            for word in words(tag)
+        ]
+        weights = {}
+        for column, terms in enumerate(self._column_terms):
+            matched = sum(1 for alts in tag_words if alts & terms)
+            if matched:
+                weights[column] = matched / len(tag_words)
+        return weights
+
+    def recommend(self, tag_counts: Mapping[str, int], limit: int) -> List[Tuple[int, float]]:
+        """Return up to `limit` (therapist_id, score) pairs, best first.
+
+        Ties are broken by rating and then id. Therapists sharing nothing
+        with the tags are never returned.
+        """
+        with self._lock:
+            size = len(self._rows)
+            width = len(self._column_terms)
+            profile = np.zeros(width, dtype=np.float32)
+            for tag, count in tag_counts.items():
+                for column, weight in self._weights_for(tag.lower()).items():
+                    profile[column] += count * weight
+            norm = np.linalg.norm(profile)
+            if not size or not norm:
+                return []
+            scores = self._matrix[:size, :width] @ (profile / norm)
+            ids = self._ids[:size].copy()
+            ratings = self._ratings[:size].copy()
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            # Partition by score, keeping every row tied with the cutoff so
+            # the tie-break below still sees them
+            cutoff = np.partition(scores[candidates], -limit)[-limit]
+            candidates = candidates[scores[candidates] >= cutoff]
+        order = np.lexsort((ids[candidates], -ratings[candidates], -scores[candidates]))
+        top = candidates[order[:limit]]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+therapist_recommender = TherapistRecommender()
@@ -0,0 +1,133 @@
+"""Concurrent-request throughput of the journal and therapist APIs against a running server.
+
+Start the API first, e.g. ``uvicorn app.main:app --port 8000`` with one
+worker, then run ``python benchmarks/concurrent_requests.py``. The script
+logs in, optionally imports a batch of entries so searches have work to
+do, and then keeps `--concurrency` clients busy for `--duration` seconds
+with a mix of journal list, search, stats and single-entry reads and
+therapist directory listings, searches and fuzzy searches.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+import httpx
+
+WORDS = (
+    "anxious calm morning walk sleep work family friend grateful tired "
+    "focus therapy breathing journal progress setback hope rain coffee "
+    "meeting deadline weekend exercise music reading"
+).split()
+
+# Directory search terms, and misspellings of them for fuzzy search
+THERAPIST_TERMS = "anxiety depression trauma stress couples grief addiction relationship".split()
+THERAPIST_TYPOS = "anxeity depresion truama stres coupels greif adiction relatinship".split()
+
+def _entry(i: int) -> dict:
+    rng = random.Random(i)
+    return {
+        "title": " ".join(rng.choices(WORDS, k=3)),
+        "content": " ".join(rng.choices(WORDS, k=rng.randint(80, 300))),
+        "tags": rng.sample(WORDS, 3),
+    }
+
+def _requests(rng: random.Random, entry_ids: list):
+    """One request from the mix: (label, path, params)."""
+    kind = rng.random()
+    if kind < 0.25:
+        return "list", "/journals/", {"page": rng.randint(1, 5), "view": "summary"}
+    if kind < 0.42:
+        return "search", "/journals/", {"search": " ".join(rng.sample(WORDS, 2)), "per_page": 20}
+    if kind < 0.52:
+        return "stats", "/journals/stats", {"period": rng.choice(["day", "week"])}
+    if kind < 0.58:
+        return "tags", "/journals/tags", {}
+    if kind < 0.72:
+        params = {"page": rng.randint(1, 5), "facets": "category,specialization,rating"}
+        if rng.random() < 0.5:
+            params["min_rating"] = rng.choice([3.5, 4.0, 4.5])
+        if rng.random() < 0.5:
+            params["sort"] = rng.choice(["rating", "experience"])
+        return "t-list", "/therapists", params
+    if kind < 0.84:
+        return "t-search", "/therapists", {"search": rng.choice(THERAPIST_TERMS), "sort": "relevance"}
+    if kind < 0.94:
+        return "t-fuzzy", "/therapists", {
+            "search": rng.choice(THERAPIST_TYPOS),
+            "fuzzy": "true",
+            "page": rng.randint(1, 3),
+            "facets": "category",
+        }
+    if entry_ids:
+        return "get", f"/journals/{rng.choice(entry_ids)}", {}
+    return "list", "/journals/", {}
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post("/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def _seed(client: httpx.AsyncClient, headers: dict, count: int) -> None:
+    for start in range(0, count, 1000):
+        batch = [_entry(i) for i in range(start, min(start + 1000, count))]
+        response = await client.post("/journals/bulk", json=batch, headers=headers)
+        response.raise_for_status()
+
+async def _worker(client, headers, entry_ids, deadline, seed, latencies, errors):
+    rng = random.Random(seed)
+    while time.monotonic() < deadline:
+        label, path, params = _requests(rng, entry_ids)
+        started = time.monotonic()
+        try:
+            response = await client.get(path, params=params, headers=headers)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        latencies[label].append(time.monotonic() - started)
+        if not ok:
+            errors[label] += 1
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def main(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        headers = await _login(client, args.email, args.password)
+        if args.seed:
+            await _seed(client, headers, args.seed)
+        listing = await client.get("/journals/", params={"per_page": 100}, headers=headers)
+        entry_ids = [item["id"] for item in listing.json()["data"]]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        started = time.monotonic()
+        await asyncio.gather(*(
+            _worker(client, headers, entry_ids, started + args.duration, seed, latencies, errors)
+            for seed in range(args.concurrency)
+        ))
+        elapsed = time.monotonic() - started
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} requests in {elapsed:.1f}s with {args.concurrency} clients: {total / elapsed:.1f} req/s")
+    print(f"{'request':<8} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for label in sorted(latencies):
+        values = latencies[label]
+        print(
+            f"{label:<8} {len(values):>6} {errors[label]:>6} "
+            f"{1000 * statistics.median(values):>8.1f} {1000 * _percentile(values, 0.95):>8.1f} "
+            f"{1000 * max(values):>8.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api")
+    parser.add_argument("--email", default="test@example.com")
+    parser.add_argument("--password", default="secret")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0, help="Entries to import before measuring")
+    asyncio.run(main(parser.parse_args()))
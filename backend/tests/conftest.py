@@ -0,0 +1,61 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read when app.core.config is first imported, so point the
+# app at a scratch database before anything from it is loaded
+_db_dir = tempfile.mkdtemp(prefix="therapist-tests-")
+os.environ["SQLITE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+@pytest.fixture(scope="session")
+def client():
+    # Entering the client runs the lifespan: indexes built, writer started
+    with TestClient(app) as client:
+        yield client
+
+def register(client) -> dict:
+    """Register a fresh user and return their auth headers."""
+    response = client.post("/api/register", json={
+        "email": f"{uuid.uuid4().hex}@example.com",
+        "password": "correct horse battery",
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def auth(client):
+    return register(client)
+
+@pytest.fixture
+def category():
+    # Therapists are shared by every test; a category of its own keeps
+    # each test's listings apart
+    return f"Category {uuid.uuid4().hex}"
+
+def make_therapist(client, category: str, **fields) -> dict:
+    body = {
+        "name": "Test Therapist",
+        "category": category,
+        "qualification": "MS (Psychology)",
+        "experience": "5 years",
+        "description": "Helps with anxiety.",
+        "rating": 4.0,
+        "specialization": ["CBT"],
+    }
+    body.update(fields)
+    response = client.post("/api/therapists", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def make_journal(client, headers: dict, **fields) -> dict:
+    body = {"title": "Entry", "content": "Some thoughts.", "tags": ["test"]}
+    body.update(fields)
+    response = client.post("/api/journals/", json=body, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+from app.db.session import SessionLocal
+from app.models.journal import Journal
+from conftest import make_journal, make_therapist, register
+
+# Adds an entry for a user from a separate process, as another worker would
+_WRITE_ELSEWHERE = """
+import sys
+from app.crud import journal as journal_crud
+from app.models.user import User
+from app.db.session import SessionLocal
+db = SessionLocal()
+journal_crud.create_journal(db, sys.argv[1], title="Elsewhere", content="Written elsewhere.", tags=[])
+db.close()
+"""
+
+def _etag_status(client, url: str, etag: str, headers: dict = None) -> int:
+    return client.get(url, headers={**(headers or {}), "If-None-Match": etag}).status_code
+
+def test_journal_list_ignores_other_users_writes(client, auth):
+    make_journal(client, auth)
+    etag = client.get("/api/journals/", headers=auth).headers["etag"]
+
+    make_journal(client, register(client))
+    assert _etag_status(client, "/api/journals/", etag, auth) == 304
+
+    make_journal(client, auth)
+    assert _etag_status(client, "/api/journals/", etag, auth) == 200
+
+def test_journal_entry_changes_with_its_owner(client, auth):
+    journal = make_journal(client, auth)
+    url = f"/api/journals/{journal['id']}"
+    etag = client.get(url, headers=auth).headers["etag"]
+    assert _etag_status(client, url, etag, auth) == 304
+
+    client.patch(url, json={"title": "Renamed", "version": journal["version"]}, headers=auth)
+    assert _etag_status(client, url, etag, auth) == 200
+
+def test_journal_list_sees_writes_from_other_processes(client, auth):
+    journal = make_journal(client, auth)
+    etag = client.get("/api/journals/", headers=auth).headers["etag"]
+
+    db = SessionLocal()
+    try:
+        user_id = db.get(Journal, journal["id"]).user_id
+    finally:
+        db.close()
+    # The scratch database is passed on through the environment
+    subprocess.run([sys.executable, "-c", _WRITE_ELSEWHERE, user_id], check=True)
+
+    assert _etag_status(client, "/api/journals/", etag, auth) == 200
+
+def test_therapist_list_ignores_journal_writes(client, auth, category):
+    make_therapist(client, category)
+    url = f"/api/therapists?category={category}"
+    etag = client.get(url).headers["etag"]
+
+    make_journal(client, auth)
+    assert _etag_status(client, url, etag) == 304
+
+    make_therapist(client, category)
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.crud import therapist as therapist_crud
+from app.db.session import SessionLocal
+from conftest import make_therapist
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+    build_indexes = therapist_crud.build_indexes
+
+    def counting(db):
+        calls.append(1)
+        return build_indexes(db)
+
+    monkeypatch.setattr(therapist_crud, "build_indexes", counting)
+    return calls
+
+def _import_elsewhere(monkeypatch, category: str, count: int) -> None:
+    """Import therapists the way another process would: this one's indexes never hear of them."""
+    rows = [{
+        "name": f"Elsewhere {i}",
+        "category": category,
+        "qualification": "MS (Psychology)",
+        "experience": "5 years",
+        "description": "Written by another process.",
+        "rating": 4.0,
+        "specialization": ["CBT", f"Specialty {i}"],
+    } for i in range(count)]
+    with monkeypatch.context() as m:
+        m.setattr(therapist_crud, "_after_write", lambda *args, **kwargs: None)
+        db = SessionLocal()
+        try:
+            therapist_crud.bulk_create_therapists(db, rows)
+        finally:
+            db.close()
+
+def _get_all(client, requests: list) -> list:
+    pool = ThreadPoolExecutor(max_workers=len(requests))
+    try:
+        futures = [pool.submit(request) for request in requests]
+        # A deadlocked event loop shows up as a timeout, not a hung test
+        return [future.result(timeout=30) for future in futures]
+    finally:
+        pool.shutdown(wait=False)
+
+def test_concurrent_readers_share_one_rebuild(client, monkeypatch, rebuilds, category):
+    make_therapist(client, category)
+    # Enough rows that the rebuild is still running when the other
+    # readers arrive
+    _import_elsewhere(monkeypatch, category, 2000)
+
+    url = f"/api/therapists?category={category}&facets=category"
+    responses = _get_all(client, [lambda: client.get(url)] * 20)
+
+    assert [r.status_code for r in responses] == [200] * 20
+    assert all(r.json()["facets"]["category"] == {category: 2001} for r in responses)
+    assert len(rebuilds) == 1
+
+def test_in_process_writes_do_not_rebuild(client, rebuilds, category):
+    therapists = [make_therapist(client, category) for _ in range(5)]
+    client.get("/api/therapists")
+    rebuilds.clear()
+
+    def put(therapist):
+        return lambda: client.put(f"/api/therapists/{therapist['id']}", json={"rating": 2.5})
+
+    url = f"/api/therapists?category={category}&facets=rating"
+    requests = [put(t) for t in therapists] + [lambda: client.get(url)] * 30
+    responses = _get_all(client, requests)
+
+    assert [r.status_code for r in responses] == [200] * len(requests)
+    assert rebuilds == []
+    facets = client.get(url).json()["facets"]
+    assert facets["rating"] == {"2.5": 5}
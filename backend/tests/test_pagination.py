@@ -0,0 +1,52 @@
+import pytest
+from conftest import make_journal, make_therapist
+
+def _walk(client, url: str, params: dict, headers: dict = None) -> list:
+    """Follow next_cursor from the first page to the end and return the ids."""
+    page = client.get(url, params=params, headers=headers).json()
+    key = "items" if "items" in page else "data"
+    ids = [item["id"] for item in page[key]]
+    while page["next_cursor"]:
+        response = client.get(url, params={**params, "cursor": page["next_cursor"]}, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids.extend(item["id"] for item in page[key])
+    return ids
+
+@pytest.fixture
+def directory(client, category):
+    # Ties on the sort key and unparsed experience exercise the id
+    # tie-break and the NULL handling of the keyset
+    rows = [
+        (4.5, "10 years"), (4.5, "3 years"), (3.0, "10 years"), (5.0, "Fresher"),
+        (3.0, "7 years"), (4.5, "7 years"), (2.0, "Fresher"),
+    ]
+    return [make_therapist(client, category, rating=rating, experience=experience) for rating, experience in rows]
+
+@pytest.mark.parametrize("sort", [None, "rating", "experience"])
+def test_therapist_cursor_round_trip(client, category, directory, sort):
+    params = {"category": category, "per_page": 2}
+    if sort:
+        params["sort"] = sort
+    expected = [item["id"] for item in client.get(
+        "/api/therapists", params={**params, "per_page": 100}
+    ).json()["items"]]
+
+    assert sorted(expected) == sorted(t["id"] for t in directory)
+    assert _walk(client, "/api/therapists", params) == expected
+
+def test_therapist_cursor_rejects_other_sort(client, category, directory):
+    page = client.get("/api/therapists", params={"category": category, "per_page": 2, "sort": "rating"}).json()
+    response = client.get("/api/therapists", params={
+        "category": category, "per_page": 2, "sort": "experience", "cursor": page["next_cursor"]
+    })
+    assert response.status_code == 400
+
+def test_journal_cursor_round_trip(client, auth):
+    created = [make_journal(client, auth, title=f"Entry {i}") for i in range(7)]
+    expected = [item["id"] for item in client.get(
+        "/api/journals/", params={"per_page": 100}, headers=auth
+    ).json()["data"]]
+
+    assert sorted(expected) == sorted(j["id"] for j in created)
+    assert _walk(client, "/api/journals/", {"per_page": 3}, headers=auth) == expected
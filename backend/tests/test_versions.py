@@ -0,0 +1,47 @@
+from conftest import make_journal, make_therapist
+
+def test_journal_patch_with_stale_version_conflicts(client, auth):
+    journal = make_journal(client, auth)
+    url = f"/api/journals/{journal['id']}"
+
+    response = client.patch(url, json={"title": "First", "version": journal["version"]}, headers=auth)
+    assert response.status_code == 200
+    assert response.json()["version"] == journal["version"] + 1
+
+    response = client.patch(url, json={"title": "Second", "version": journal["version"]}, headers=auth)
+    assert response.status_code == 409
+    assert client.get(url, headers=auth).json()["title"] == "First"
+
+def test_journal_delete_with_stale_version_conflicts(client, auth):
+    journal = make_journal(client, auth)
+    url = f"/api/journals/{journal['id']}"
+    updated = client.patch(url, json={"content": "Edited", "version": journal["version"]}, headers=auth).json()
+
+    response = client.delete(url, params={"version": journal["version"]}, headers=auth)
+    assert response.status_code == 409
+    assert client.get(url, headers=auth).status_code == 200
+
+    response = client.delete(url, params={"version": updated["version"]}, headers=auth)
+    assert response.status_code == 200
+    assert client.get(url, headers=auth).status_code == 404
+
+def test_therapist_put_with_stale_version_conflicts(client, category):
+    therapist = make_therapist(client, category)
+    url = f"/api/therapists/{therapist['id']}"
+
+    response = client.put(url, json={"rating": 4.5, "version": therapist["version"]})
+    assert response.status_code == 200
+    assert response.json()["version"] == therapist["version"] + 1
+
+    response = client.put(url, json={"rating": 1.0, "version": therapist["version"]})
+    assert response.status_code == 409
+    assert client.get(url).json()["rating"] == 4.5
+
+def test_therapist_put_without_version_always_applies(client, category):
+    therapist = make_therapist(client, category)
+    url = f"/api/therapists/{therapist['id']}"
+    client.put(url, json={"rating": 4.5, "version": therapist["version"]})
+
+    response = client.put(url, json={"rating": 3.5})
+    assert response.status_code == 200
+    assert response.json()["rating"] == 3.5
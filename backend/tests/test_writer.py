@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import text
+from app.db.session import engine
+from app.db.writer import GroupCommitWriter, commit
+
+@pytest.fixture
+def writer(client):
+    # Wide enough that writes submitted back to back share a batch
+    writer = GroupCommitWriter(window=0.2, max_batch=16)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS writer_probe (name TEXT PRIMARY KEY)"))
+        conn.execute(text("DELETE FROM writer_probe"))
+    yield writer
+    writer.stop()
+
+def _committed_names() -> list:
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT name FROM writer_probe ORDER BY name"))]
+
+def _insert(name: str, hooks: list, fail: bool = False):
+    def write(db):
+        db.execute(text("INSERT INTO writer_probe (name) VALUES (:name)"), {"name": name})
+        if fail:
+            raise ValueError(name)
+        # Record what another connection sees when the hook runs
+        commit(db, after=lambda: hooks.append((name, _committed_names())))
+        return name
+    return write
+
+def test_failed_write_only_rolls_back_itself(writer):
+    hooks = []
+    futures = [
+        writer.submit(_insert("a", hooks)),
+        writer.submit(_insert("b", hooks, fail=True)),
+        writer.submit(_insert("c", hooks)),
+    ]
+
+    assert futures[0].result(timeout=5) == "a"
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == "c"
+    assert writer.stats()["batches"] == 1
+    assert _committed_names() == ["a", "c"]
+
+def test_hooks_run_in_order_after_commit(writer):
+    hooks = []
+    futures = [writer.submit(_insert(name, hooks, fail=name == "y")) for name in ("x", "y", "z")]
+    for future in futures:
+        future.exception(timeout=5)
+
+    # The failed write's hook never runs, and the others see the whole
+    # batch durable, not just their own row
+    assert hooks == [("x", ["x", "z"]), ("z", ["x", "z"])]
+
+def test_conflicting_write_does_not_fail_the_batch(writer):
+    hooks = []
+    writer.run(_insert("dup", hooks))
+    futures = [writer.submit(_insert("dup", hooks)), writer.submit(_insert("new", hooks))]
+
+    assert futures[0].exception(timeout=5) is not None
+    assert futures[1].result(timeout=5) == "new"
+    assert _committed_names() == ["dup", "new"]
@@ -8,7 +8,8 @@ import { Textarea } from '@/components/ui/textarea';
 import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuTrigger } from '@/components/ui/dropdown-menu';
 import { DotsVerticalIcon } from '@radix-ui/react-icons';
 import { format } from 'date-fns';
-import { getJournals, createJournal, updateJournal, deleteJournal, type Journal, type JournalResponse } from '@/lib/api';
+import { getJournals, createJournal, updateJournal, deleteJournal, getToken, logout, UnauthorizedError, type Journal, type JournalResponse } from '@/lib/api';
+import { LoginForm } from './login-form';
 
 
 export function JournalList() {
@@ -27,6 +28,17 @@ export function JournalList() {
   });
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [signedIn, setSignedIn] = useState(true);
+
+  // Any request made with a missing or expired token sends the user back
+  // to the sign-in form
+  const handleError = (message: string, error: unknown) => {
+    if (error instanceof UnauthorizedError) {
+      setSignedIn(false);
+      return;
+    }
+    console.error(message, error);
+  };
 
   const fetchJournals = async () => {
     try {
@@ -36,16 +48,22 @@ export function JournalList() {
       setTotalPages(data.total_pages);
       setError(null);
     } catch (error) {
-      console.error('Error fetching journals:', error);
-      setError('Failed to load journals. Please try again later.');
+      handleError('Error fetching journals:', error);
+      if (!(error instanceof UnauthorizedError)) {
+        setError('Failed to load journals. Please try again later.');
+      }
     } finally {
       setLoading(false);
     }
   };
 
   useEffect(() => {
+    if (!getToken()) {
+      setSignedIn(false);
+      return;
+    }
     fetchJournals();
-  }, [currentPage, searchTerm]);
+  }, [currentPage, searchTerm, signedIn]);
 
   const handleCreateSubmit = async () => {
     try {
@@ -57,7 +75,7 @@ export function JournalList() {
       setFormData({ title: '', content: '', tags: '' });
       fetchJournals();
     } catch (error) {
-      console.error('Error creating journal:', error);
+      handleError('Error creating journal:', error);
     }
   };
 
@@ -73,7 +91,7 @@ export function JournalList() {
       setFormData({ title: '', content: '', tags: '' });
       fetchJournals();
     } catch (error) {
-      console.error('Error updating journal:', error);
+      handleError('Error updating journal:', error);
     }
   };
 
@@ -83,7 +101,7 @@ export function JournalList() {
       await deleteJournal(id);
       fetchJournals();
     } catch (error) {
-      console.error('Error deleting journal:', error);
+      handleError('Error deleting journal:', error);
     }
   };
 
@@ -93,6 +111,10 @@ export function JournalList() {
     return words.slice(0, 50).join(' ') + '...';
   };
 
+  if (!signedIn) {
+    return <LoginForm onLogin={() => setSignedIn(true)} />;
+  }
+
   return (
     <div className="space-y-6">
       <div className="flex justify-between items-center">
@@ -103,7 +125,16 @@ export function JournalList() {
           value={searchTerm}
           onChange={(e) => setSearchTerm(e.target.value)}
         />
-        <Button onClick={() => setIsCreateModalOpen(true)}>Create New Entry</Button>
+        <div className="flex gap-2">
+          <Button onClick={() => setIsCreateModalOpen(true)}>Create New Entry</Button>
+          <Button variant="outline" onClick={() => {
+            logout();
+            setJournals([]);
+            setSignedIn(false);
+          }}>
+            Sign out
+          </Button>
+        </div>
       </div>
 
       <div className="space-y-4">
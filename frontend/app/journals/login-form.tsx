@@ -0,0 +1,51 @@
+'use client';
+
+import { useState } from 'react';
+import { Button } from '@/components/ui/button';
+import { Input } from '@/components/ui/input';
+import { login } from '@/lib/api';
+
+export function LoginForm({ onLogin }: { onLogin: () => void }) {
+  const [email, setEmail] = useState('');
+  const [password, setPassword] = useState('');
+  const [submitting, setSubmitting] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    try {
+      setSubmitting(true);
+      await login(email, password);
+      setError(null);
+      onLogin();
+    } catch (error) {
+      setError(error instanceof Error ? error.message : 'Failed to sign in');
+    } finally {
+      setSubmitting(false);
+    }
+  };
+
+  return (
+    <form onSubmit={handleSubmit} className="max-w-sm space-y-4">
+      <p className="text-gray-600">Sign in to see your journal.</p>
+      <Input
+        type="email"
+        placeholder="Email"
+        value={email}
+        onChange={(e) => setEmail(e.target.value)}
+        required
+      />
+      <Input
+        type="password"
+        placeholder="Password"
+        value={password}
+        onChange={(e) => setPassword(e.target.value)}
+        required
+      />
+      {error && <p className="text-sm text-red-500">{error}</p>}
+      <Button type="submit" disabled={submitting}>
+        {submitting ? 'Signing in...' : 'Sign in'}
+      </Button>
+    </form>
+  );
+}
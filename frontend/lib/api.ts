@@ -1,4 +1,57 @@
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
+const TOKEN_KEY = 'accessToken';
+
+// Thrown when the API rejects or is missing the access token; the caller
+// should ask the user to sign in again
+export class UnauthorizedError extends Error {
+  constructor() {
+    super('Not signed in');
+  }
+}
+
+export function getToken(): string | null {
+  return typeof window === 'undefined' ? null : window.localStorage.getItem(TOKEN_KEY);
+}
+
+export function logout(): void {
+  window.localStorage.removeItem(TOKEN_KEY);
+}
+
+export async function login(email: string, password: string): Promise<void> {
+  const response = await fetch(`${API_BASE_URL}/login`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ email, password }),
+  });
+  if (response.status === 401) {
+    throw new Error('Incorrect email or password');
+  }
+  if (!response.ok) {
+    throw new Error('Failed to sign in');
+  }
+  const { access_token } = await response.json();
+  window.localStorage.setItem(TOKEN_KEY, access_token);
+}
+
+// fetch with the stored bearer token; a 401 drops the token
+async function authFetch(
+  url: string,
+  init: Omit<RequestInit, 'headers'> & { headers?: Record<string, string> } = {}
+): Promise<Response> {
+  const token = getToken();
+  if (!token) {
+    throw new UnauthorizedError();
+  }
+  const response = await fetch(url, {
+    ...init,
+    headers: { ...init.headers, Authorization: `Bearer ${token}` },
+  });
+  if (response.status === 401) {
+    logout();
+    throw new UnauthorizedError();
+  }
+  return response;
+}
 
 export interface Therapist {
   id: number;
@@ -83,7 +136,7 @@ export async function getJournals(
     ...(search && { search })
   });
 
-  const response = await fetch(`${API_BASE_URL}/journals?${params}`);
+  const response = await authFetch(`${API_BASE_URL}/journals/?${params}`);
   if (!response.ok) {
     throw new Error('Failed to fetch journals');
   }
@@ -95,7 +148,7 @@ export async function createJournal(journalData: {
   content: string;
   tags: string[];
 }): Promise<Journal> {
-  const response = await fetch(`${API_BASE_URL}/journals`, {
+  const response = await authFetch(`${API_BASE_URL}/journals/`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(journalData),
@@ -115,7 +168,7 @@ export async function updateJournal(
     tags: string[];
   }
 ): Promise<Journal> {
-  const response = await fetch(`${API_BASE_URL}/journals/${id}`, {
+  const response = await authFetch(`${API_BASE_URL}/journals/${id}`, {
     method: 'PUT',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(journalData),
@@ -128,7 +181,7 @@ export async function updateJournal(
 }
 
 export async function deleteJournal(id: string): Promise<void> {
-  const response = await fetch(`${API_BASE_URL}/journals/${id}`, {
+  const response = await authFetch(`${API_BASE_URL}/journals/${id}`, {
     method: 'DELETE',
   });
   